@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.core.inference import run_inference
+from app.core.inference import run_inference_async
 from app.core.session import get_session_id
 from app.errors import InvalidInputError, ProcessingError
 from app.infra.logging import get_logger
@@ -29,8 +29,8 @@ async def process_chat_message(
             f"Processing chat message: {request.message[:50]}{'...' if len(request.message) > 50 else ''}"
         )
 
-        # Run unified inference pipeline
-        response = run_inference(request.message, session_id)
+        # Run unified inference pipeline off the event loop
+        response = await run_inference_async(request.message, session_id)
 
         # Return structured response
         return ChatResponse(response=response, session_id=session_id)
@@ -1,110 +1,149 @@
+import re
+import threading
 import uuid
 from datetime import datetime, timedelta
 from typing import Any
 
+# Conversation pattern counter bumped for each intent
+_INTENT_PATTERNS = {
+    "member.biography": "member_questions",
+    "band.members": "member_questions",
+    "album.info": "album_questions",
+    "song.info": "song_questions",
+    "band.history": "general_questions",
+}
+
+# Phrases that mark a message as a follow-up question, matched as substrings
+_FOLLOW_UP_INDICATORS = (
+    "what about",
+    "how about",
+    "tell me more",
+    "and",
+    "also",
+    "too",
+    "what else",
+    "anything else",
+    "more",
+    "other",
+    "different",
+    "in what year",
+    "when was",
+    "who wrote",
+)
+_FOLLOW_UP_RE = re.compile("|".join(map(re.escape, _FOLLOW_UP_INDICATORS)))
+
 
 class ConversationMemory:
     def __init__(self, max_sessions: int = 100, session_timeout_hours: int = 24):
         self.sessions: dict[str, dict[str, Any]] = {}
+        # Requests run in worker threads; public methods hold this lock and
+        # the private helpers expect it to be held already
+        self._lock = threading.Lock()
         self.max_sessions = max_sessions
         self.session_timeout_hours = session_timeout_hours
 
     def create_session(self) -> str:
         """Create a new conversation session and return its ID."""
-        session_id = str(uuid.uuid4())
-
-        # Clean up old sessions if we're at capacity
-        if len(self.sessions) >= self.max_sessions:
-            self._cleanup_old_sessions()
-
-        self.sessions[session_id] = {
-            "created_at": datetime.now(),
-            "last_activity": datetime.now(),
-            "messages": [],
-            "entities": [],
-            "context": {
-                "current_topic": None,
-                "last_album": None,
-                "last_song": None,
-                "last_member": None,
-                "last_topic": None,
-                "mentioned_members": set(),
-                "mentioned_albums": set(),
-                "mentioned_songs": set(),
-                "conversation_flow": [],
-            },
-        }
-
-        return session_id
+        with self._lock:
+            session_id = str(uuid.uuid4())
+
+            # Clean up old sessions if we're at capacity
+            if len(self.sessions) >= self.max_sessions:
+                self._cleanup_old_sessions()
+
+            self.sessions[session_id] = {
+                "created_at": datetime.now(),
+                "last_activity": datetime.now(),
+                "messages": [],
+                "entities": [],
+                "context": {
+                    "current_topic": None,
+                    "last_album": None,
+                    "last_song": None,
+                    "last_member": None,
+                    "last_topic": None,
+                    "mentioned_members": set(),
+                    "mentioned_albums": set(),
+                    "mentioned_songs": set(),
+                    "conversation_flow": [],
+                },
+            }
+
+            return session_id
 
     def add_message(
         self, session_id: str, user_message: str, bot_response: dict[str, Any]
     ) -> None:
         """Add a message exchange to the conversation history."""
-        if session_id not in self.sessions:
-            return
-
-        session = self.sessions[session_id]
-        session["last_activity"] = datetime.now()
-
-        # Add message to history
-        message_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "user_message": user_message,
-            "bot_message": bot_response.get("message", ""),
-            "intent": bot_response.get("intent"),
-            "confidence": bot_response.get("confidence"),
-            "entities": bot_response.get("entities", []),
-        }
+        with self._lock:
+            if session_id not in self.sessions:
+                return
+
+            session = self.sessions[session_id]
+            now = datetime.now()
+            session["last_activity"] = now
+
+            # Add message to history
+            message_entry = {
+                "timestamp": now.isoformat(),
+                "user_message": user_message,
+                "bot_message": bot_response.get("message", ""),
+                "intent": bot_response.get("intent"),
+                "confidence": bot_response.get("confidence"),
+                "entities": bot_response.get("entities", []),
+            }
 
-        session["messages"].append(message_entry)
+            session["messages"].append(message_entry)
 
-        # Update context
-        self._update_context(session_id, message_entry)
+            # Update context
+            self._update_context(session_id, message_entry)
 
-        # Keep only last 10 messages to prevent memory bloat
-        if len(session["messages"]) > 10:
-            session["messages"] = session["messages"][-10:]
+            # Keep only last 10 messages to prevent memory bloat
+            if len(session["messages"]) > 10:
+                session["messages"] = session["messages"][-10:]
 
     def get_conversation_history(
         self, session_id: str, max_messages: int = 5
     ) -> list[dict[str, Any]]:
         """Get recent conversation history for context."""
-        if session_id not in self.sessions:
-            return []
+        with self._lock:
+            if session_id not in self.sessions:
+                return []
 
-        session = self.sessions[session_id]
-        return session["messages"][-max_messages:]
+            session = self.sessions[session_id]
+            return session["messages"][-max_messages:]
 
     def get_context(self, session_id: str) -> dict[str, Any]:
         """Get conversation context including mentioned entities and topics."""
-        if session_id not in self.sessions:
-            return {}
+        with self._lock:
+            if session_id not in self.sessions:
+                return {}
 
-        session = self.sessions[session_id]
-        context = session["context"].copy()
+            session = self.sessions[session_id]
+            context = session["context"].copy()
 
-        # Convert sets to lists for JSON serialization
-        context["mentioned_members"] = list(context["mentioned_members"])
-        context["mentioned_albums"] = list(context["mentioned_albums"])
-        context["mentioned_songs"] = list(context["mentioned_songs"])
+            # Convert sets to lists for JSON serialization
+            context["mentioned_members"] = list(context["mentioned_members"])
+            context["mentioned_albums"] = list(context["mentioned_albums"])
+            context["mentioned_songs"] = list(context["mentioned_songs"])
 
-        return context
+            return context
 
     def get_follow_up_context(self, session_id: str) -> dict[str, Any]:
         """Get follow-up context slots for resolving pronouns and ellipses."""
-        if session_id not in self.sessions:
-            return {}
-
-        session = self.sessions[session_id]
-        context = session["context"]
-
-        return {
-            "last_album": context.get("last_album"),
-            "last_song": context.get("last_song"),
-            "last_member": context.get("last_member"),
-            "last_topic": context.get("last_topic"),
-        }
+        with self._lock:
+            if session_id not in self.sessions:
+                return {}
+
+            session = self.sessions[session_id]
+            context = session["context"]
+
+            return {
+                "last_album": context.get("last_album"),
+                "last_song": context.get("last_song"),
+                "last_member": context.get("last_member"),
+                "last_topic": context.get("last_topic"),
+            }
 
     def _update_context(self, session_id: str, message_entry: dict[str, Any]) -> None:
         """Update conversation context based on the latest message."""
@@ -158,17 +197,16 @@ class ConversationMemory:
                 context["conversation_flow"] = context["conversation_flow"][-10:]
 
         # Update current topic based on intent and entities
-        if intent in ["member.biography", "band.members"] or any(
-            e["type"] == "member" for e in entities
-        ):
+        entity_types = {e["type"] for e in entities}
+        if intent in ("member.biography", "band.members") or "member" in entity_types:
             context["current_topic"] = "band_members"
             context["last_topic"] = "band_members"
             context["topic_confidence"] = 0.9
-        elif intent in ["album.info"] or any(e["type"] == "album" for e in entities):
+        elif intent == "album.info" or "album" in entity_types:
             context["current_topic"] = "albums"
             context["last_topic"] = "albums"
             context["topic_confidence"] = 0.9
-        elif intent in ["song.info"] or any(e["type"] == "song" for e in entities):
+        elif intent == "song.info" or "song" in entity_types:
             context["current_topic"] = "songs"
             context["last_topic"] = "songs"
             context["topic_confidence"] = 0.9
@@ -195,34 +233,13 @@ class ConversationMemory:
             }
 
         # Update pattern counts
-        if intent in ["member.biography", "band.members"]:
-            context["patterns"]["member_questions"] += 1
-        elif intent in ["album.info"]:
-            context["patterns"]["album_questions"] += 1
-        elif intent in ["song.info"]:
-            context["patterns"]["song_questions"] += 1
-        elif intent in ["band.history"]:
-            context["patterns"]["general_questions"] += 1
+        pattern = _INTENT_PATTERNS.get(intent) if isinstance(intent, str) else None
+        if pattern:
+            context["patterns"][pattern] += 1
 
         # Detect follow-up questions
         user_message = message_entry.get("user_message", "").lower()
-        follow_up_indicators = [
-            "what about",
-            "how about",
-            "tell me more",
-            "and",
-            "also",
-            "too",
-            "what else",
-            "anything else",
-            "more",
-            "other",
-            "different",
-            "in what year",
-            "when was",
-            "who wrote",
-        ]
-        if any(indicator in user_message for indicator in follow_up_indicators):
+        if _FOLLOW_UP_RE.search(user_message):
             context["patterns"]["follow_up_questions"] += 1
 
     def _cleanup_old_sessions(self) -> None:
@@ -240,17 +257,21 @@ class ConversationMemory:
 
     def is_session_valid(self, session_id: str) -> bool:
         """Check if a session is still valid (not expired)."""
-        if session_id not in self.sessions:
-            return False
+        with self._lock:
+            if session_id not in self.sessions:
+                return False
 
-        session = self.sessions[session_id]
-        timeout_threshold = datetime.now() - timedelta(hours=self.session_timeout_hours)
-        return session["last_activity"] > timeout_threshold
+            session = self.sessions[session_id]
+            timeout_threshold = datetime.now() - timedelta(
+                hours=self.session_timeout_hours
+            )
+            return session["last_activity"] > timeout_threshold
 
     def get_session_stats(self) -> dict[str, Any]:
         """Get statistics about active sessions."""
-        return {
-            "total_sessions": len(self.sessions),
-            "max_sessions": self.max_sessions,
-            "session_timeout_hours": self.session_timeout_hours,
-        }
+        with self._lock:
+            return {
+                "total_sessions": len(self.sessions),
+                "max_sessions": self.max_sessions,
+                "session_timeout_hours": self.session_timeout_hours,
+            }
@@ -1,22 +1,395 @@
+import asyncio
+import functools
 import random
 import re
+import sys
 from typing import Any
 
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.utils.extmath import softmax
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional accelerator
+    ahocorasick = None
+
 CONFIDENCE_THRESHOLD = 0.05  # Adjusted threshold based on actual model performance
 
+# Number of distinct messages whose extracted entities are memoized per processor
+ENTITY_CACHE_SIZE = 4096
+# Number of distinct messages whose top intent is memoized per processor
+CLASSIFICATION_CACHE_SIZE = 1024
+
+# Bare greetings are answered without the classifier, keyed on the lowercased
+# message stripped of surrounding whitespace and trailing punctuation; a
+# message with nothing left is "unknown" at zero confidence.
+_FAST_INTENTS = {
+    "hi": "greetings.hello",
+    "hello": "greetings.hello",
+    "hey": "greetings.hello",
+    "bye": "greetings.bye",
+    "goodbye": "greetings.bye",
+}
+FAST_INTENT_CONFIDENCE = 0.99
+
+# Micro-batching for get_classifications_async: concurrent messages are
+# collected for up to MAX_BATCH_WAIT_MS and classified in one predict_proba.
+MAX_BATCH_SIZE = 32
+MAX_BATCH_WAIT_MS = 5
+
+# (vectorizer, transposed coef, intercept) of a TF-IDF -> logistic regression model
+LinearHead = tuple[Any, np.ndarray, np.ndarray]
+
+# Response templates for _generate_basic_response, keyed by lowercased entity
+# name and filled in with str.format_map.
+_KIEDIS_BIO = "Anthony Kiedis is the lead vocalist and primary lyricist of RHCP. He's been with the band since {member_since} and is known for his unique vocal style and energetic stage presence. He's also written a memoir called 'Scar Tissue' about his life and struggles."
+_FLEA_BIO = "Flea (Michael Balzary) is the bassist and co-founding member of RHCP. He's been with the band since {member_since} and is known for his distinctive funky bass lines, energetic performances, and his work as an actor. He's considered one of the most influential bassists in rock music."
+_FRUSCIANTE_BIO = "John Frusciante is the guitarist of RHCP. He first joined in 1988, left in 1992, returned in 1998, left again in 2009, and rejoined in 2019. He's known for his unique guitar style, melodic solos, and contributions to albums like 'Blood Sugar Sex Magik' and 'Californication'."
+_SMITH_BIO = "Chad Smith is the drummer of RHCP, joining in {member_since}. He's known for his powerful drumming style, technical proficiency, and his work with other bands like Chickenfoot. He's been a consistent member and has played on most of their albums."
+
+_MEMBER_BIO_TEMPLATES = {
+    "anthony kiedis": _KIEDIS_BIO,
+    "anthony": _KIEDIS_BIO,
+    "kiedis": _KIEDIS_BIO,
+    "flea": _FLEA_BIO,
+    "michael flea": _FLEA_BIO,
+    "michael balzary": _FLEA_BIO,
+    "john frusciante": _FRUSCIANTE_BIO,
+    "john": _FRUSCIANTE_BIO,
+    "frusciante": _FRUSCIANTE_BIO,
+    "chad smith": _SMITH_BIO,
+    "chad": _SMITH_BIO,
+    "smith": _SMITH_BIO,
+}
+
+_BSSM_SUMMARY = "'{album_name}' was released on {release_date} and produced by {producer}. This album was a breakthrough for RHCP, featuring hits like 'Under the Bridge' and 'Give It Away'. It's considered one of their most influential albums and helped define the alternative rock sound of the 1990s."
+
+_ALBUM_TEMPLATES = {
+    "blood sugar sex magik": _BSSM_SUMMARY,
+    "blood sugar": _BSSM_SUMMARY,
+    "californication": "'{album_name}' was released on {release_date} and produced by {producer}. This album marked a return to form for the band and includes hits like 'Scar Tissue', 'Otherside', and 'Californication'. It's one of their most successful albums commercially.",
+    "by the way": "'{album_name}' was released on {release_date} and produced by {producer}. This album shows a more melodic side of RHCP with hits like 'By the Way' and 'Can't Stop'. It's known for its more polished sound compared to their earlier work.",
+    "stadium arcadium": "'{album_name}' was released on {release_date} and produced by {producer}. This double album won the Grammy for Best Rock Album and includes hits like 'Dani California' and 'Snow (Hey Oh)'. It's one of their most ambitious projects.",
+    "unlimited love": "'{album_name}' was released on {release_date} and produced by {producer}. This is their latest album and marks the return of John Frusciante to the band. It includes the hit single 'Black Summer' and shows the band returning to their classic sound.",
+}
+
+_SONG_TEMPLATES = {
+    "under the bridge": "'{song_name}' is from the album '{album_name}'. It's one of RHCP's most iconic songs, written by Anthony Kiedis about his feelings of isolation in Los Angeles. The song features a beautiful melody and is considered one of their signature tracks.",
+    "californication": "'{song_name}' is from the album '{album_name}'. This song critiques the artificial nature of Hollywood and California culture. It features John Frusciante's distinctive guitar work and is one of their most recognizable songs.",
+    "scar tissue": "'{song_name}' is from the album '{album_name}'. This song deals with themes of addiction and recovery, reflecting Anthony Kiedis's personal struggles. It won a Grammy for Best Rock Song.",
+    "otherside": "'{song_name}' is from the album '{album_name}'. This song addresses the theme of drug addiction and the struggle to overcome it. It features a memorable bass line from Flea and emotional vocals from Kiedis.",
+    "by the way": "'{song_name}' is from the album '{album_name}'. This song shows a more melodic side of RHCP with its catchy chorus and harmonies. It was a major hit and helped define their sound in the 2000s.",
+}
+_DEFAULT_SONG_TEMPLATE = "'{song_name}' is from the album '{album_name}'. It's a great track that showcases the band's unique style and musical chemistry."
+
+# Intents that are consistent with finding an entity of each type
+_ENTITY_TYPE_INTENTS = {
+    "album": frozenset({"album.specific", "album.info"}),
+    "song": frozenset({"song.specific", "song.info", "song.lyrics"}),
+    "member": frozenset({"member.biography", "band.members"}),
+}
+# Intent to fall back on when the classified one doesn't fit, by priority
+_ENTITY_OVERRIDE_INTENTS = (
+    ("album", "album.info"),
+    ("song", "song.info"),
+    ("member", "member.biography"),
+)
+# A reasonable confidence for entity-based detection
+ENTITY_OVERRIDE_CONFIDENCE = 0.5
+
+# Entity types that may name either a song or an album
+_AMBIGUOUS_TYPES = frozenset({"song", "album"})
+
+# Entity tables scanned by _find_entities_in_text, in output order, each paired
+# with a builder for the entity record emitted on a match.
+_ENTITY_SPECS = (
+    (
+        "known_members",
+        lambda info, variation: {
+            "type": "member",
+            "value": info["details"],
+            "matched_text": variation,
+            "member_type": info["type"],
+        },
+    ),
+    (
+        "known_albums",
+        lambda info, variation: {
+            "type": "album",
+            "value": info["details"],
+            "matched_text": variation,
+            "album_type": info["type"],
+        },
+    ),
+    (
+        "known_songs",
+        lambda info, variation: {
+            "type": "song",
+            "value": {
+                "name": info["name"],
+                "album": info["album"],
+                "album_details": info["album_details"],
+            },
+            "matched_text": variation,
+        },
+    ),
+)
+
+
+# Latin-1 \w characters, precomputed so the common case is one set lookup
+_LATIN1_WORD_CHARS = frozenset(
+    char for char in map(chr, range(256)) if char.isalnum() or char == "_"
+)
+
+
+def _is_word_char(char: str) -> bool:
+    """Mirror the regex definition of a \\w character."""
+    return char in _LATIN1_WORD_CHARS or (char > "\xff" and char.isalnum())
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Check that text[start:end] is delimited like r"\\b...\\b" would require."""
+    before = start > 0 and _is_word_char(text[start - 1])
+    after = end < len(text) and _is_word_char(text[end])
+    return before != _is_word_char(text[start]) and after != _is_word_char(
+        text[end - 1]
+    )
+
+
+# Nickname tables for the member and album builders: (keywords, aliases) rows,
+# where the first row with a keyword contained in the lowercased name applies.
+_CURRENT_MEMBER_ALIASES = (
+    (
+        ("flea", "balzary"),
+        ("flea", "michael flea", "michael balzary", "balzary", "mike flea"),
+    ),
+    (("anthony", "kiedis"), ("anthony", "kiedis", "tony", "anthony kiedis", "ak")),
+    (("john", "frusciante"), ("john", "frusciante", "johnny", "john frusciante", "jf")),
+    (("chad", "smith"), ("chad", "smith", "chad smith", "chadwick")),
+)
+
+_FORMER_MEMBER_ALIASES = (
+    (("hillel", "slovak"), ("hillel", "slovak", "hillel slovak")),
+    (("jack", "irons"), ("jack", "irons", "jack irons")),
+    (("josh", "klinghoffer"), ("josh", "klinghoffer", "josh klinghoffer", "jk")),
+    (("dave", "navarro"), ("dave", "navarro", "dave navarro", "dn")),
+)
+
+_ALBUM_ALIASES = (
+    (("blood sugar sex magik",), ("blood sugar", "bssm", "blood sugar sex magic")),
+    (("californication",), ("cali", "californication")),
+    (("by the way",), ("btw", "by the way")),
+    (("stadium arcadium",), ("stadium", "arcadium", "sa")),
+    (("unlimited love",), ("unlimited", "ul")),
+    (("the getaway",), ("getaway", "tg")),
+    (("i'm with you",), ("im with you", "iwy")),
+    (("one hot minute",), ("ohm", "one hot minute")),
+    (("mother's milk",), ("mothers milk", "mother milk", "mm")),
+    (("uplift mofo party plan",), ("uplift", "mofo", "umpp")),
+    (("freaky styley",), ("freaky", "styley", "fs")),
+    (("the red hot chili peppers",), ("debut", "first album", "rhcp debut")),
+)
+
+# Song nicknames keyed on the exact lowercased track title
+_SONG_ALIASES: dict[str, tuple[str, ...]] = {
+    "under the bridge": ("utb", "under bridge"),
+    "californication": ("cali",),
+    "scar tissue": ("scar",),
+    "otherside": ("other side",),
+    "by the way": ("btw",),
+    "dani california": ("dani", "dani cali"),
+    "snow (hey oh)": ("snow", "hey oh", "snow hey oh"),
+    "give it away": ("give away", "gia"),
+    "breaking the girl": ("breaking girl", "btg"),
+    "suck my kiss": ("smk",),
+    "around the world": ("atw",),
+    "parallel universe": ("parallel", "pu"),
+    "get on top": ("got",),
+    "easily": ("easy",),
+    "porcelain": ("porc",),
+    "emit remmus": ("emit", "remmus"),
+    "i like dirt": ("dirt",),
+    "this velvet glove": ("velvet glove", "tvg"),
+    "savior": ("save",),
+    "purple stain": ("purple", "stain"),
+    "right on time": ("rot",),
+    "road trippin'": ("road trip", "rt"),
+    "black summer": ("black", "summer", "bs"),
+    "here ever after": ("here after", "hea"),
+    "aquatic mouth dance": ("aquatic", "mouth dance", "amd"),
+    "not the one": ("nto",),
+    "poster child": ("poster", "child", "pc"),
+    "the great apes": ("great apes", "tga"),
+    "it's only natural": ("its only natural", "ion", "natural"),
+    "she's a lover": ("shes a lover", "sal", "lover"),
+    "these are the ways": ("these ways", "tatw", "ways"),
+    "whatchu thinkin'": ("whatchu", "thinkin", "wt"),
+    "bastards of light": ("bastards", "light", "bol"),
+    "white braids & pillow chair": (
+        "white braids",
+        "pillow chair",
+        "wbp",
+        "braids",
+        "pillow",
+    ),
+}
+
+
+def _aliases_for(
+    name: str, alias_table: tuple[tuple[tuple[str, ...], tuple[str, ...]], ...]
+) -> tuple[str, ...]:
+    """Return the aliases of the first alias_table row matching name."""
+    for keywords, aliases in alias_table:
+        if any(keyword in name for keyword in keywords):
+            return aliases
+    return ()
+
+
+def _member_name_variations(name: str) -> list[str]:
+    """Spelling variants of a lowercased member name, plus first/last name."""
+    parts = name.split()
+    return [name, name.replace("'", ""), name.replace(" ", ""), parts[0], parts[-1]]
+
+
+def _title_variations(name: str) -> list[str]:
+    """Spelling variants of a lowercased album or song title."""
+    return [
+        name,
+        name.replace("'", ""),
+        name.replace(" ", ""),
+        name.replace("&", "and"),
+    ]
+
+
+def _fast_intent(clean_message: str) -> tuple[str, float] | None:
+    """Return the (intent, confidence) of an empty message or a bare greeting,
+    or None if the classifier is needed."""
+    key = clean_message.strip().rstrip("!.?")
+    if not key:
+        return "unknown", 0.0
+    intent = _FAST_INTENTS.get(key)
+    return None if intent is None else (intent, FAST_INTENT_CONFIDENCE)
+
+
+def _tracks_preview(tracks: list[str] | None) -> str:
+    """Sentence tail listing an album's first five tracks, or "" if none."""
+    if not tracks:
+        return ""
+    ellipsis = "..." if len(tracks) > 5 else ""
+    return f". It includes tracks like {', '.join(tracks[:5])}{ellipsis}."
+
+
+def _fail_futures(
+    batch: list[tuple[str, asyncio.Future[np.ndarray]]], exc: BaseException
+) -> None:
+    """Fail every still-pending future of a classifier batch with exc."""
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(exc)
+
+
+def _freeze_variations(variations: list[str]) -> tuple[str, ...]:
+    """Freeze a built variation list into a tuple of interned strings.
+
+    Repeats (e.g. "flea" from both the name and its alias list) are dropped,
+    keeping the first occurrence so match order is unchanged.
+    """
+    return tuple(sys.intern(variation) for variation in dict.fromkeys(variations))
+
 
 class ChatbotProcessor:
-    def __init__(self, classifier, training_data, static_data, memory_manager=None):
+    # Substring match, so plurals like "songs" also count as naming an entity
+    _HAS_ENTITY_NOUN = re.compile(r"album|song|track")
+    # Also a substring match: "and" deliberately fires inside words like "band"
+    _FOLLOW_UP_INDICATORS = re.compile(
+        r"in what year|when was|who wrote|tell me more|what about|how about"
+        r"|and|also|too",
+        re.IGNORECASE,
+    )
+
+    def __init__(
+        self, classifier, training_data, static_data, memory_manager=None, seed=None
+    ):
         self.classifier = classifier
+        # Plain-Python copy of the label array, plus label -> column lookups
+        self._classes = tuple(classifier.classes_)
+        self._class_index = {label: i for i, label in enumerate(self._classes)}
+        # (vectorizer, coef, intercept) when the model is a plain TF-IDF ->
+        # multinomial logistic regression pipeline we can evaluate directly
+        self._linear_head = self._build_linear_head()
         self.training_data = training_data
         self.static_data = static_data or {}
         self.memory_manager = memory_manager
+        self._answers_by_intent = self._build_answers_by_intent()
+        # Per-instance RNG for picking canned answers; seed it for repeatable replies
+        self._rng = random.Random(seed)
 
         # Pre-compile lists of known entities with multiple variations
         # Use safe defaults if static_data is missing or incomplete
         self.known_members = self._build_member_variations()
         self.known_albums = self._build_album_variations()
         self.known_songs = self._build_song_variations()
+        # Lowercased name -> entry, for follow-up lookups by remembered name
+        self._album_by_name: dict[str, dict[str, Any]] = {}
+        for album in self.known_albums:
+            self._album_by_name.setdefault(album["name"].lower(), album)
+        self._song_by_name: dict[str, dict[str, Any]] = {}
+        for song in self.known_songs:
+            self._song_by_name.setdefault(song["name"].lower(), song)
+        self._automaton = self._build_entity_automaton()
+        # Cheap rejection tests: a message shorter than every variation, or
+        # sharing no non-space character with any of them, cannot contain one
+        all_variations = [
+            variation
+            for entries in (self.known_members, self.known_albums, self.known_songs)
+            for info in entries
+            for variation in info["variations"]
+        ]
+        self._min_entity_len = min(map(len, all_variations), default=0)
+        self._entity_charset = frozenset("".join(all_variations)) - {" "}
+        # Variation trie for the fallback scan, built on first use
+        self._trie: dict | None = None
+
+        # Entity extraction is the hottest pure-Python step of a turn, and chat
+        # traffic repeats a lot ("who is flea"), so memoize it per message.
+        self._scan_entities_cached = functools.lru_cache(maxsize=ENTITY_CACHE_SIZE)(
+            self._scan_entities
+        )
+        # Likewise for classification, a pure function of the message, so
+        # greetings and FAQs skip the model. The probability rows back
+        # get_classifications; the top intent is cached on its own as well
+        # so the per-turn path does not rebuild it from a row every time.
+        self._proba_row_cached = functools.lru_cache(maxsize=CLASSIFICATION_CACHE_SIZE)(
+            self._proba_row
+        )
+        self._top_intent_cached = functools.lru_cache(
+            maxsize=CLASSIFICATION_CACHE_SIZE
+        )(self._top_intent)
+
+        # Pending (message, future) pairs for the batching classifier loop; the
+        # queue and its worker task are bound to the event loop that created them.
+        self._classify_queue: asyncio.Queue | None = None
+        self._classify_loop: asyncio.AbstractEventLoop | None = None
+        self._classify_task: asyncio.Task | None = None
+
+    def _build_answers_by_intent(self) -> dict[str, list[str]]:
+        """Map each intent to its canned answers, preferring the base corpus.
+
+        Only the first entry for an intent in each corpus is considered, and
+        an intent whose entry has no answers falls through to the next corpus.
+        """
+        answers_by_intent: dict[str, list[str]] = {}
+        for corpus_name in ("base", "rhcp"):
+            corpus = (self.training_data or {}).get(corpus_name) or {}
+            first_items: dict[str, dict] = {}
+            for item in corpus.get("data", []):
+                first_items.setdefault(item["intent"], item)
+            for intent, item in first_items.items():
+                if item.get("answers"):
+                    answers_by_intent.setdefault(intent, item["answers"])
+        return answers_by_intent
 
     def _build_member_variations(self):
         """Build comprehensive member name variations including nicknames and aliases."""
@@ -29,33 +402,16 @@ class ChatbotProcessor:
 
         # Current members
         for member in current_members:
-            name = member["name"].lower()
-            variations = [
-                name,
-                name.replace("'", ""),
-                name.replace(" ", ""),
-                name.split()[0],
-                name.split()[-1],
-            ]
+            name = sys.intern(member["name"].lower())
+            variations = _member_name_variations(name)
 
             # Add common nicknames and variations
-            if "flea" in name or "balzary" in name:
-                variations.extend(
-                    ["flea", "michael flea", "michael balzary", "balzary", "mike flea"]
-                )
-            elif "anthony" in name or "kiedis" in name:
-                variations.extend(["anthony", "kiedis", "tony", "anthony kiedis", "ak"])
-            elif "john" in name or "frusciante" in name:
-                variations.extend(
-                    ["john", "frusciante", "johnny", "john frusciante", "jf"]
-                )
-            elif "chad" in name or "smith" in name:
-                variations.extend(["chad", "smith", "chad smith", "chadwick"])
+            variations.extend(_aliases_for(name, _CURRENT_MEMBER_ALIASES))
 
             members.append(
                 {
                     "name": name,
-                    "variations": variations,
+                    "variations": _freeze_variations(variations),
                     "details": member,
                     "type": "current",
                 }
@@ -63,29 +419,16 @@ class ChatbotProcessor:
 
         # Former members
         for member in former_members:
-            name = member["name"].lower()
-            variations = [
-                name,
-                name.replace("'", ""),
-                name.replace(" ", ""),
-                name.split()[0],
-                name.split()[-1],
-            ]
+            name = sys.intern(member["name"].lower())
+            variations = _member_name_variations(name)
 
             # Add common nicknames for former members
-            if "hillel" in name or "slovak" in name:
-                variations.extend(["hillel", "slovak", "hillel slovak"])
-            elif "jack" in name or "irons" in name:
-                variations.extend(["jack", "irons", "jack irons"])
-            elif "josh" in name or "klinghoffer" in name:
-                variations.extend(["josh", "klinghoffer", "josh klinghoffer", "jk"])
-            elif "dave" in name or "navarro" in name:
-                variations.extend(["dave", "navarro", "dave navarro", "dn"])
+            variations.extend(_aliases_for(name, _FORMER_MEMBER_ALIASES))
 
             members.append(
                 {
                     "name": name,
-                    "variations": variations,
+                    "variations": _freeze_variations(variations),
                     "details": member,
                     "type": "former",
                 }
@@ -130,46 +473,19 @@ class ChatbotProcessor:
         for album_type in ["studioAlbums", "compilationAlbums", "liveAlbums"]:
             album_list = discography.get(album_type, [])
             for album in album_list:
-                name = album["name"].lower()
-                variations = [
-                    name,
-                    name.replace("'", ""),
-                    name.replace(" ", ""),
-                    name.replace("&", "and"),
-                ]
+                name = sys.intern(album["name"].lower())
+                variations = _title_variations(name)
 
                 # Add common abbreviations and alternative names
-                if "blood sugar sex magik" in name:
-                    variations.extend(["blood sugar", "bssm", "blood sugar sex magic"])
-                elif "californication" in name:
-                    variations.extend(["cali", "californication"])
-                elif "by the way" in name:
-                    variations.extend(["btw", "by the way"])
-                elif "stadium arcadium" in name:
-                    variations.extend(["stadium", "arcadium", "sa"])
-                elif "unlimited love" in name:
-                    variations.extend(["unlimited", "ul"])
-                elif "the getaway" in name:
-                    variations.extend(["getaway", "tg"])
-                elif "i'm with you" in name:
-                    variations.extend(["im with you", "iwy"])
-                elif "one hot minute" in name:
-                    variations.extend(["ohm", "one hot minute"])
-                elif "mother's milk" in name:
-                    variations.extend(["mothers milk", "mother milk", "mm"])
-                elif "uplift mofo party plan" in name:
-                    variations.extend(["uplift", "mofo", "umpp"])
-                elif "freaky styley" in name:
-                    variations.extend(["freaky", "styley", "fs"])
-                elif "the red hot chili peppers" in name:
-                    variations.extend(["debut", "first album", "rhcp debut"])
+                variations.extend(_aliases_for(name, _ALBUM_ALIASES))
 
                 albums.append(
                     {
                         "name": name,
-                        "variations": variations,
+                        "variations": _freeze_variations(variations),
                         "details": album,
                         "type": album_type,
+                        "tracks_preview": _tracks_preview(album.get("tracks")),
                     }
                 )
 
@@ -187,96 +503,16 @@ class ChatbotProcessor:
             for album in album_list:
                 if "tracks" in album and isinstance(album["tracks"], list):
                     for track in album["tracks"]:
-                        name = track.lower()
-                        variations = [
-                            name,
-                            name.replace("'", ""),
-                            name.replace(" ", ""),
-                            name.replace("&", "and"),
-                        ]
+                        name = sys.intern(track.lower())
+                        variations = _title_variations(name)
 
                         # Add common abbreviations and alternative names for popular songs
-                        if "under the bridge" in name:
-                            variations.extend(["utb", "under bridge"])
-                        elif "californication" in name:
-                            variations.extend(["cali"])
-                        elif "scar tissue" in name:
-                            variations.extend(["scar"])
-                        elif "otherside" in name:
-                            variations.extend(["other side"])
-                        elif "by the way" in name:
-                            variations.extend(["btw"])
-                        elif "dani california" in name:
-                            variations.extend(["dani", "dani cali"])
-                        elif "snow (hey oh)" in name:
-                            variations.extend(["snow", "hey oh", "snow hey oh"])
-                        elif "give it away" in name:
-                            variations.extend(["give away", "gia"])
-                        elif "breaking the girl" in name:
-                            variations.extend(["breaking girl", "btg"])
-                        elif "suck my kiss" in name:
-                            variations.extend(["smk"])
-                        elif "around the world" in name:
-                            variations.extend(["atw"])
-                        elif "parallel universe" in name:
-                            variations.extend(["parallel", "pu"])
-                        elif "get on top" in name:
-                            variations.extend(["got"])
-                        elif "easily" in name:
-                            variations.extend(["easy"])
-                        elif "porcelain" in name:
-                            variations.extend(["porc"])
-                        elif "emit remmus" in name:
-                            variations.extend(["emit", "remmus"])
-                        elif "i like dirt" in name:
-                            variations.extend(["dirt"])
-                        elif "this velvet glove" in name:
-                            variations.extend(["velvet glove", "tvg"])
-                        elif "savior" in name:
-                            variations.extend(["save"])
-                        elif "purple stain" in name:
-                            variations.extend(["purple", "stain"])
-                        elif "right on time" in name:
-                            variations.extend(["rot"])
-                        elif "road trippin" in name:
-                            variations.extend(["road trip", "rt"])
-                        elif "black summer" in name:
-                            variations.extend(["black", "summer", "bs"])
-                        elif "here ever after" in name:
-                            variations.extend(["here after", "hea"])
-                        elif "aquatic mouth dance" in name:
-                            variations.extend(["aquatic", "mouth dance", "amd"])
-                        elif "not the one" in name:
-                            variations.extend(["nto"])
-                        elif "poster child" in name:
-                            variations.extend(["poster", "child", "pc"])
-                        elif "the great apes" in name:
-                            variations.extend(["great apes", "tga"])
-                        elif "it's only natural" in name:
-                            variations.extend(["its only natural", "ion", "natural"])
-                        elif "she's a lover" in name:
-                            variations.extend(["shes a lover", "sal", "lover"])
-                        elif "these are the ways" in name:
-                            variations.extend(["these ways", "tatw", "ways"])
-                        elif "whatchu thinkin" in name:
-                            variations.extend(["whatchu", "thinkin", "wt"])
-                        elif "bastards of light" in name:
-                            variations.extend(["bastards", "light", "bol"])
-                        elif "white braids & pillow chair" in name:
-                            variations.extend(
-                                [
-                                    "white braids",
-                                    "pillow chair",
-                                    "wbp",
-                                    "braids",
-                                    "pillow",
-                                ]
-                            )
+                        variations.extend(_SONG_ALIASES.get(name, ()))
 
                         songs.append(
                             {
                                 "name": name,
-                                "variations": variations,
+                                "variations": _freeze_variations(variations),
                                 "album": album["name"],
                                 "album_details": album,
                             }
@@ -286,61 +522,117 @@ class ChatbotProcessor:
 
     def _find_entities_in_text(self, text):
         """Enhanced entity recognition with fuzzy matching and context awareness."""
-        entities = []
-
-        # Find members
-        for member_info in self.known_members:
-            for variation in member_info["variations"]:
-                if variation in text:
-                    # Check if it's not part of a larger word
-                    pattern = r"\b" + re.escape(variation) + r"\b"
-                    if re.search(pattern, text):
-                        entities.append(
-                            {
-                                "type": "member",
-                                "value": member_info["details"],
-                                "matched_text": variation,
-                                "member_type": member_info["type"],
-                            }
-                        )
-                        break  # Found this member, move to next
-
-        # Find albums
-        for album_info in self.known_albums:
-            for variation in album_info["variations"]:
-                if variation in text:
-                    pattern = r"\b" + re.escape(variation) + r"\b"
-                    if re.search(pattern, text):
-                        entities.append(
-                            {
-                                "type": "album",
-                                "value": album_info["details"],
-                                "matched_text": variation,
-                                "album_type": album_info["type"],
-                            }
+        # Canonicalize case and whitespace once so variants of the same message
+        # match the lowercase, single-spaced variations and share a cache entry
+        text = " ".join(text.lower().split())
+        if len(text) < self._min_entity_len or self._entity_charset.isdisjoint(text):
+            return []
+        return list(self._scan_entities_cached(text))
+
+    def _variation_refs(self) -> dict[str, tuple[tuple[int, int, int], ...]]:
+        """Map each non-empty variation to the (spec, entity, variation)
+        indexes it belongs to; one string can name several entities
+        (e.g. "cali")."""
+        refs: dict[str, list[tuple[int, int, int]]] = {}
+        for spec_index, (attr, _make_entity) in enumerate(_ENTITY_SPECS):
+            for entity_index, entity_info in enumerate(getattr(self, attr)):
+                for variation_index, variation in enumerate(entity_info["variations"]):
+                    if variation:
+                        refs.setdefault(variation, []).append(
+                            (spec_index, entity_index, variation_index)
                         )
-                        break
+        return {variation: tuple(refs) for variation, refs in refs.items()}
 
-        # Find songs
-        for song_info in self.known_songs:
-            for variation in song_info["variations"]:
-                if variation in text:
-                    pattern = r"\b" + re.escape(variation) + r"\b"
-                    if re.search(pattern, text):
-                        entities.append(
-                            {
-                                "type": "song",
-                                "value": {
-                                    "name": song_info["name"],
-                                    "album": song_info["album"],
-                                    "album_details": song_info["album_details"],
-                                },
-                                "matched_text": variation,
-                            }
-                        )
-                        break
+    def _build_entity_automaton(self) -> Any:
+        """Compile every entity variation into a single Aho-Corasick automaton.
 
-        return entities
+        Each key maps to the variation and its _variation_refs entry.
+        Returns None when pyahocorasick is not installed.
+        """
+        if ahocorasick is None:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for variation, variation_refs in self._variation_refs().items():
+            automaton.add_word(variation, (variation, variation_refs))
+        automaton.make_automaton()
+        return automaton
+
+    def _build_entity_trie(self) -> dict:
+        """Build a character trie over every entity variation.
+
+        Nodes are dicts keyed by character; a node that ends a variation also
+        holds its _variation_refs entry under the None key.
+        """
+        trie: dict = {}
+        for variation, variation_refs in self._variation_refs().items():
+            node = trie
+            for char in variation:
+                node = node.setdefault(char, {})
+            node[None] = variation_refs
+        return trie
+
+    def _scan_entities(self, text: str) -> tuple[dict, ...]:
+        """Scan text for known members, albums and songs (uncached)."""
+        if self._automaton is not None:
+            matches = self._match_with_automaton(text)
+        else:
+            matches = self._match_with_trie(text)
+
+        # Emit in table order, reporting the first variation (in table order)
+        # that matched each entity.
+        entities = []
+        for (spec_index, entity_index), variation_index in sorted(matches.items()):
+            attr, make_entity = _ENTITY_SPECS[spec_index]
+            entity_info = getattr(self, attr)[entity_index]
+            variation = entity_info["variations"][variation_index]
+            entities.append(make_entity(entity_info, variation))
+
+        return tuple(entities)
+
+    def _match_with_automaton(self, text: str) -> dict[tuple[int, int], int]:
+        """Find whole-word variation hits in a single pass over text."""
+        matches: dict[tuple[int, int], int] = {}
+        for end, (variation, variation_refs) in self._automaton.iter(text):
+            start = end - len(variation) + 1
+            if not _is_whole_word(text, start, end + 1):
+                continue
+            for spec_index, entity_index, variation_index in variation_refs:
+                key = (spec_index, entity_index)
+                if variation_index < matches.get(key, variation_index + 1):
+                    matches[key] = variation_index
+        return matches
+
+    def _match_with_trie(self, text: str) -> dict[tuple[int, int], int]:
+        """Fallback scan walking the variation trie from each word boundary."""
+        if self._trie is None:
+            self._trie = self._build_entity_trie()
+        trie = self._trie
+
+        matches: dict[tuple[int, int], int] = {}
+        length = len(text)
+        previous_is_word = False
+        for start in range(length):
+            is_word = _is_word_char(text[start])
+            # A whole-word match can only start where \b holds
+            starts_word = previous_is_word != is_word
+            previous_is_word = is_word
+            if not starts_word:
+                continue
+            node = trie.get(text[start])
+            end = start + 1
+            while node is not None:
+                variation_refs = node.get(None)
+                if variation_refs is not None and _is_whole_word(text, start, end):
+                    for spec_index, entity_index, variation_index in variation_refs:
+                        key = (spec_index, entity_index)
+                        if variation_index < matches.get(key, variation_index + 1):
+                            matches[key] = variation_index
+                if end == length:
+                    break
+                node = node.get(text[end])
+                end += 1
+        return matches
 
     def _enhance_message_with_context(
         self, message: str, session_id: str | None = None
@@ -349,29 +641,34 @@ class ChatbotProcessor:
         if not self.memory_manager or not session_id:
             return message
 
-        # Get follow-up context
+        # Get follow-up context; every rewrite below needs a remembered entity
         context = self.memory_manager.get_follow_up_context(session_id)
-        if not context:
+        if not (
+            context.get("last_album")
+            or context.get("last_song")
+            or context.get("last_member")
+        ):
             return message
 
         enhanced_message = message
+        message_lower = message.lower()
 
         # Resolve pronouns and ellipses
-        if "in what year" in message.lower() or "when was" in message.lower():
+        if "in what year" in message_lower or "when was" in message_lower:
             if context.get("last_album"):
                 enhanced_message = f"what year was {context['last_album']} released"
             elif context.get("last_song"):
                 enhanced_message = f"what year was {context['last_song']} released"
 
-        if "who wrote" in message.lower() and not any(
-            entity in message.lower() for entity in ["album", "song", "track"]
+        if "who wrote" in message_lower and not self._HAS_ENTITY_NOUN.search(
+            message_lower
         ):
             if context.get("last_song"):
                 enhanced_message = f"who wrote {context['last_song']}"
             elif context.get("last_album"):
                 enhanced_message = f"who wrote songs on {context['last_album']}"
 
-        if "tell me more about" in message.lower() or "what about" in message.lower():
+        if "tell me more about" in message_lower or "what about" in message_lower:
             if context.get("last_member"):
                 enhanced_message = f"tell me about {context['last_member']}"
             elif context.get("last_album"):
@@ -383,25 +680,14 @@ class ChatbotProcessor:
 
     def _is_follow_up_question(self, message: str) -> bool:
         """Detect if this is a follow-up question."""
-        follow_up_indicators = [
-            "in what year",
-            "when was",
-            "who wrote",
-            "tell me more",
-            "what about",
-            "how about",
-            "and",
-            "also",
-            "too",
-        ]
-        return any(indicator in message.lower() for indicator in follow_up_indicators)
+        return self._FOLLOW_UP_INDICATORS.search(message) is not None
 
     def _detect_ambiguity(self, entities: list[dict]) -> dict | None:
         """Detect ambiguous entities that could be both songs and albums."""
         ambiguous_entities = []
 
         for entity in entities:
-            if entity["type"] in ["song", "album"]:
+            if entity["type"] in _AMBIGUOUS_TYPES:
                 entity_name = entity["value"]["name"].lower()
 
                 # Check if this name exists in both songs and albums
@@ -441,8 +727,8 @@ class ChatbotProcessor:
             entity_name = ambiguity["entities"][0]["name"]
             return f"Do you mean the song or the album '{entity_name}'?"
 
-        # Handle follow-up questions
-        if self._is_follow_up_question(message) and self.memory_manager and session_id:
+        # Handle follow-up questions (only possible with a session to follow up on)
+        if self.memory_manager and session_id and self._is_follow_up_question(message):
             context = self.memory_manager.get_follow_up_context(session_id)
             history = self.memory_manager.get_conversation_history(session_id, 3)
 
@@ -470,62 +756,58 @@ class ChatbotProcessor:
         if "in what year" in message_lower or "when was" in message_lower:
             if context.get("last_album"):
                 # Find album release year
-                for album in self.known_albums:
-                    if album["name"].lower() == context["last_album"].lower():
-                        album_data = album.get("details", {})
-                        release_date = album_data.get("releaseDate", "")
-                        if release_date:
-                            year = (
-                                release_date.split("-")[0]
-                                if "-" in release_date
-                                else release_date
-                            )
-                            return f"{context['last_album']} was released in {year}."
+                year = self._album_release_year(context["last_album"])
+                if year:
+                    return f"{context['last_album']} was released in {year}."
                 return f"I don't have the release year for {context['last_album']}."
 
             elif context.get("last_song"):
                 # Find song release year (from album)
-                for song in self.known_songs:
-                    if song["name"].lower() == context["last_song"].lower():
-                        album_name = song.get("album", "")
-                        if album_name:
-                            for album in self.known_albums:
-                                if album["name"].lower() == album_name.lower():
-                                    album_data = album.get("details", {})
-                                    release_date = album_data.get("releaseDate", "")
-                                    if release_date:
-                                        year = (
-                                            release_date.split("-")[0]
-                                            if "-" in release_date
-                                            else release_date
-                                        )
-                                        return f"{context['last_song']} was released in {year} on the album {album_name}."
+                song = self._song_by_name.get(context["last_song"].lower())
+                album_name = song.get("album", "") if song else ""
+                year = self._album_release_year(album_name) if album_name else None
+                if year:
+                    return f"{context['last_song']} was released in {year} on the album {album_name}."
                 return f"I don't have the release year for {context['last_song']}."
 
         # Handle "who wrote" questions
         if "who wrote" in message_lower:
             if context.get("last_song"):
                 # Find song writers
-                for song in self.known_songs:
-                    if song["name"].lower() == context["last_song"].lower():
-                        song_data = song.get("details", {})
-                        writers = song_data.get("writers", [])
-                        if writers:
-                            return f"{context['last_song']} was written by {', '.join(writers)}."
-                        else:
-                            return f"I don't have writer information for {context['last_song']}."
+                song = self._song_by_name.get(context["last_song"].lower())
+                if song:
+                    song_data = song.get("details", {})
+                    writers = song_data.get("writers", [])
+                    if writers:
+                        return f"{context['last_song']} was written by {', '.join(writers)}."
+                    else:
+                        return f"I don't have writer information for {context['last_song']}."
 
         # Default to basic response if no specific follow-up handling
         return self._generate_basic_response(intent, entities)
 
+    def _album_release_year(self, album_name: str) -> str | None:
+        """Return the release year of a known album, if we have one."""
+        album = self._album_by_name.get(album_name.lower())
+        if not album:
+            return None
+        release_date: str = album.get("details", {}).get("releaseDate", "")
+        if not release_date:
+            return None
+        return release_date.split("-")[0] if "-" in release_date else release_date
+
     def _generate_basic_response(self, intent: str, entities: list[dict]) -> str:
         """Generate a basic response without context."""
         response_message = ""
         handled = False
 
-        member_entity = next((e for e in entities if e["type"] == "member"), None)
-        album_entity = next((e for e in entities if e["type"] == "album"), None)
-        song_entity = next((e for e in entities if e["type"] == "song"), None)
+        # First entity of each type, found in a single pass
+        entities_by_type: dict[str, dict] = {}
+        for entity in entities:
+            entities_by_type.setdefault(entity["type"], entity)
+        member_entity = entities_by_type.get("member")
+        album_entity = entities_by_type.get("album")
+        song_entity = entities_by_type.get("song")
 
         if intent == "unrecognized" or intent == "None":
             response_message = "I'm not sure I understood that. Could you try asking about the band members, albums, songs, or band history?"
@@ -537,14 +819,11 @@ class ChatbotProcessor:
             member_since = member.get("memberSince", "unknown year")
 
             # Enhanced biography response
-            if name.lower() in ["anthony kiedis", "anthony", "kiedis"]:
-                response_message = f"Anthony Kiedis is the lead vocalist and primary lyricist of RHCP. He's been with the band since {member_since} and is known for his unique vocal style and energetic stage presence. He's also written a memoir called 'Scar Tissue' about his life and struggles."
-            elif name.lower() in ["flea", "michael flea", "michael balzary"]:
-                response_message = f"Flea (Michael Balzary) is the bassist and co-founding member of RHCP. He's been with the band since {member_since} and is known for his distinctive funky bass lines, energetic performances, and his work as an actor. He's considered one of the most influential bassists in rock music."
-            elif name.lower() in ["john frusciante", "john", "frusciante"]:
-                response_message = "John Frusciante is the guitarist of RHCP. He first joined in 1988, left in 1992, returned in 1998, left again in 2009, and rejoined in 2019. He's known for his unique guitar style, melodic solos, and contributions to albums like 'Blood Sugar Sex Magik' and 'Californication'."
-            elif name.lower() in ["chad smith", "chad", "smith"]:
-                response_message = f"Chad Smith is the drummer of RHCP, joining in {member_since}. He's known for his powerful drumming style, technical proficiency, and his work with other bands like Chickenfoot. He's been a consistent member and has played on most of their albums."
+            template = _MEMBER_BIO_TEMPLATES.get(name.lower())
+            if template:
+                response_message = template.format_map(
+                    {"name": name, "member_since": member_since}
+                )
             else:
                 response_message = member.get(
                     "biography",
@@ -558,22 +837,23 @@ class ChatbotProcessor:
             producer = album.get("producer", "unknown producer")
 
             # Enhanced album response
-            if album_name.lower() in ["blood sugar sex magik", "blood sugar"]:
-                response_message = f"'{album_name}' was released on {release_date} and produced by {producer}. This album was a breakthrough for RHCP, featuring hits like 'Under the Bridge' and 'Give It Away'. It's considered one of their most influential albums and helped define the alternative rock sound of the 1990s."
-            elif album_name.lower() in ["californication"]:
-                response_message = f"'{album_name}' was released on {release_date} and produced by {producer}. This album marked a return to form for the band and includes hits like 'Scar Tissue', 'Otherside', and 'Californication'. It's one of their most successful albums commercially."
-            elif album_name.lower() in ["by the way"]:
-                response_message = f"'{album_name}' was released on {release_date} and produced by {producer}. This album shows a more melodic side of RHCP with hits like 'By the Way' and 'Can't Stop'. It's known for its more polished sound compared to their earlier work."
-            elif album_name.lower() in ["stadium arcadium"]:
-                response_message = f"'{album_name}' was released on {release_date} and produced by {producer}. This double album won the Grammy for Best Rock Album and includes hits like 'Dani California' and 'Snow (Hey Oh)'. It's one of their most ambitious projects."
-            elif album_name.lower() in ["unlimited love"]:
-                response_message = f"'{album_name}' was released on {release_date} and produced by {producer}. This is their latest album and marks the return of John Frusciante to the band. It includes the hit single 'Black Summer' and shows the band returning to their classic sound."
+            template = _ALBUM_TEMPLATES.get(album_name.lower())
+            if template:
+                response_message = template.format_map(
+                    {
+                        "album_name": album_name,
+                        "release_date": release_date,
+                        "producer": producer,
+                    }
+                )
             else:
-                album_info = f"'{album_name}' was released on {release_date} and produced by {producer}"
-                if album.get("tracks"):
-                    tracks_preview = ", ".join(album["tracks"][:5])
-                    album_info += f". It includes tracks like {tracks_preview}{'...' if len(album['tracks']) > 5 else ''}."
-                response_message = album_info
+                # Catalog albums carry a precomputed track preview
+                entry = self._album_by_name.get(album_name.lower())
+                if entry is not None and entry["details"] is album:
+                    tracks_preview = entry["tracks_preview"]
+                else:
+                    tracks_preview = _tracks_preview(album.get("tracks"))
+                response_message = f"'{album_name}' was released on {release_date} and produced by {producer}{tracks_preview}"
             handled = True
         elif intent in ("song.specific", "song.lyrics") and song_entity:
             song = song_entity["value"]
@@ -581,30 +861,16 @@ class ChatbotProcessor:
             album_name = song["album"]
 
             # Enhanced song response
-            if song_name.lower() in ["under the bridge"]:
-                response_message = f"'{song_name}' is from the album '{album_name}'. It's one of RHCP's most iconic songs, written by Anthony Kiedis about his feelings of isolation in Los Angeles. The song features a beautiful melody and is considered one of their signature tracks."
-            elif song_name.lower() in ["californication"]:
-                response_message = f"'{song_name}' is from the album '{album_name}'. This song critiques the artificial nature of Hollywood and California culture. It features John Frusciante's distinctive guitar work and is one of their most recognizable songs."
-            elif song_name.lower() in ["scar tissue"]:
-                response_message = f"'{song_name}' is from the album '{album_name}'. This song deals with themes of addiction and recovery, reflecting Anthony Kiedis's personal struggles. It won a Grammy for Best Rock Song."
-            elif song_name.lower() in ["otherside"]:
-                response_message = f"'{song_name}' is from the album '{album_name}'. This song addresses the theme of drug addiction and the struggle to overcome it. It features a memorable bass line from Flea and emotional vocals from Kiedis."
-            elif song_name.lower() in ["by the way"]:
-                response_message = f"'{song_name}' is from the album '{album_name}'. This song shows a more melodic side of RHCP with its catchy chorus and harmonies. It was a major hit and helped define their sound in the 2000s."
-            else:
-                response_message = f"'{song_name}' is from the album '{album_name}'. It's a great track that showcases the band's unique style and musical chemistry."
+            template = _SONG_TEMPLATES.get(song_name.lower(), _DEFAULT_SONG_TEMPLATE)
+            response_message = template.format_map(
+                {"song_name": song_name, "album_name": album_name}
+            )
             handled = True
 
         if not handled and intent not in ["unrecognized", "None"]:
-            found_intent_data = None
-            for corpus_name in ["base", "rhcp"]:
-                corpus_data = self.training_data[corpus_name]["data"]
-                found_intent_data = next(
-                    (item for item in corpus_data if item["intent"] == intent), None
-                )
-                if found_intent_data and found_intent_data.get("answers"):
-                    response_message = random.choice(found_intent_data["answers"])
-                    break
+            answers = self._answers_by_intent.get(intent)
+            if answers:
+                response_message = self._rng.choice(answers)
             if not response_message:
                 response_message = f"I understood your intent is '{intent}', but I don't have a specific response for that yet."
 
@@ -613,23 +879,211 @@ class ChatbotProcessor:
 
         return response_message
 
-    def get_classifications(self, message):
+    def _build_linear_head(self) -> LinearHead | None:
+        """Unpack a vectorizer + multinomial LogisticRegression pipeline.
+
+        Returns None, so callers use the pipeline's own predict_proba, for any
+        other model shape or if the direct computation disagrees with it.
+        """
+        classifier = self.classifier
+        if not isinstance(classifier, Pipeline) or len(classifier.steps) != 2:
+            return None
+        vectorizer = classifier.steps[0][1]
+        model = classifier.steps[-1][1]
+        if (
+            not isinstance(model, LogisticRegression)
+            or len(model.classes_) <= 2
+            or model.solver == "liblinear"
+            # "deprecated" is the default since scikit-learn 1.5: multinomial
+            or getattr(model, "multi_class", "auto")
+            not in ("auto", "multinomial", "deprecated")
+        ):
+            return None
+
+        head = (vectorizer, np.ascontiguousarray(model.coef_.T), model.intercept_)
+        probe = ["hello"]
+        if not np.allclose(
+            self._linear_proba(head, probe), classifier.predict_proba(probe)
+        ):
+            return None
+        return head
+
+    @staticmethod
+    def _linear_proba(head: LinearHead, messages: list[str]) -> np.ndarray:
+        vectorizer, coef_t, intercept = head
+        logits = vectorizer.transform(messages) @ coef_t + intercept
+        probabilities: np.ndarray = softmax(logits, copy=False)
+        return probabilities
+
+    def _predict_proba(self, messages: list[str]) -> np.ndarray:
+        """Class probabilities for a batch of messages, one row per message."""
+        if self._linear_head is not None:
+            return self._linear_proba(self._linear_head, messages)
+        probabilities: np.ndarray = self.classifier.predict_proba(messages)
+        return probabilities
+
+    def get_classifications(
+        self, message: str, top_k: int | None = None
+    ) -> list[dict[str, Any]]:
         """
         Returns a list of classifications for a message, sorted by confidence.
+
+        Only the ``top_k`` best classes are returned when it is given.
         """
         # The classifier is a scikit-learn pipeline, so we predict probabilities.
-        probabilities = self.classifier.predict_proba([message])[0]
-        # Pair class labels with their probabilities
-        class_probabilities = zip(self.classifier.classes_, probabilities, strict=False)
-        # Sort by probability in descending order
-        sorted_classifications = sorted(
-            class_probabilities, key=lambda item: item[1], reverse=True
-        )
-        # Format to match the original structure
+        probabilities = self._proba_row_cached(message)
+        return self._rank_classifications(probabilities, top_k)
+
+    def _proba_row(self, message: str) -> np.ndarray:
+        """Class probabilities for one message, as a read-only row."""
+        probabilities: np.ndarray = self._predict_proba([message])[0]
+        # The row is shared by every cache hit, so callers must not edit it
+        probabilities.flags.writeable = False
+        return probabilities
+
+    def _top_intent(self, message: str) -> tuple[str, float]:
+        """Return the best (label, confidence) pair for a message."""
+        return self._best_class(self._proba_row_cached(message))
+
+    def classify(self, clean_message: str) -> tuple[str, float]:
+        """Return the (intent, confidence) pair for a lowercased message.
+
+        Empty messages and bare greetings skip the classifier entirely.
+        """
+        return _fast_intent(clean_message) or self._top_intent_cached(clean_message)
+
+    async def classify_async(self, clean_message: str) -> tuple[str, float]:
+        """Like classify, but sends the message through the batching worker so
+        concurrent callers share one predict_proba call."""
+        fast = _fast_intent(clean_message)
+        if fast is not None:
+            return fast
+        return self._best_class(await self._predict_proba_batched(clean_message))
+
+    def _top_intents(self, messages: list[str]) -> list[tuple[str, float]]:
+        """Like classify, for a batch of lowercased messages; whatever needs
+        the classifier goes through a single predict_proba call."""
+        fast_results = [_fast_intent(message) for message in messages]
+        pending = [
+            message
+            for message, result in zip(messages, fast_results, strict=True)
+            if result is None
+        ]
+        classified = iter(self._best_classes(pending) if pending else ())
+        return [result or next(classified) for result in fast_results]
+
+    def _best_classes(self, messages: list[str]) -> list[tuple[str, float]]:
+        """Return the best (label, confidence) pair per message, classifying
+        the whole batch with one predict_proba call."""
+        probabilities = self._predict_proba(messages)
+        best = probabilities.argmax(axis=1)
+        confidences = probabilities[np.arange(len(messages)), best]
+        classes = self._classes
+        return [
+            (classes[index], confidence)
+            for index, confidence in zip(
+                best.tolist(), confidences.tolist(), strict=True
+            )
+        ]
+
+    def _best_class(self, probabilities: np.ndarray) -> tuple[str, float]:
+        """Return the (label, confidence) pair for one row of probabilities."""
+        index = int(probabilities.argmax())
+        return self._classes[index], float(probabilities[index])
+
+    def _rank_classifications(
+        self, probabilities: np.ndarray, top_k: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Pair class labels with one row of probabilities, best first."""
+        if top_k is not None and top_k < len(probabilities):
+            # Select the k best in C, then only sort those
+            indices = np.sort(np.argpartition(-probabilities, top_k)[:top_k])
+        else:
+            indices = np.arange(len(probabilities))
+        # Stable sort keeps class order for ties, like sorted() did
+        indices = indices[np.argsort(-probabilities[indices], kind="stable")]
+        classes = self._classes
         return [
-            {"label": label, "value": value} for label, value in sorted_classifications
+            {"label": classes[i], "value": probabilities[i]} for i in indices.tolist()
         ]
 
+    async def get_classifications_async(self, message: str) -> list[dict[str, Any]]:
+        """
+        Async variant of get_classifications that shares one predict_proba
+        call with any other messages classified within MAX_BATCH_WAIT_MS.
+        """
+        probabilities = await self._predict_proba_batched(message)
+        return self._rank_classifications(probabilities)
+
+    def start_worker(self) -> None:
+        """Start the batching classifier worker on the running event loop.
+
+        Calling this is optional (the worker starts on first use), but doing
+        it at application startup keeps the first request off the slow path.
+        """
+        self._worker_queue()
+
+    def stop_worker(self) -> None:
+        """Cancel the batching classifier worker, e.g. at application shutdown.
+
+        Messages still waiting for a classification fail with RuntimeError.
+        The next async classification starts a fresh worker.
+        """
+        task, queue = self._classify_task, self._classify_queue
+        self._classify_task = self._classify_queue = self._classify_loop = None
+        if task is not None:
+            # The batch it is holding is failed by classifier_loop itself
+            task.cancel()
+        if queue is not None:
+            stopped = RuntimeError("Classifier worker stopped")
+            while not queue.empty():
+                _fail_futures([queue.get_nowait()], stopped)
+
+    def _worker_queue(self) -> asyncio.Queue:
+        """Return the running loop's classifier queue, starting its worker
+        if there is none or the previous one has stopped."""
+        loop = asyncio.get_running_loop()
+        queue = self._classify_queue
+        if queue is None or self._classify_loop is not loop:
+            queue = self._classify_queue = asyncio.Queue()
+            self._classify_loop = loop
+            self._classify_task = None
+        if self._classify_task is None or self._classify_task.done():
+            self._classify_task = loop.create_task(self.classifier_loop(queue))
+        return queue
+
+    async def _predict_proba_batched(self, message: str) -> np.ndarray:
+        """Queue a message for the batching worker and await its row."""
+        future: asyncio.Future[np.ndarray] = asyncio.get_running_loop().create_future()
+        await self._worker_queue().put((message, future))
+        return await future
+
+    async def classifier_loop(self, queue: asyncio.Queue) -> None:
+        """Drain queued messages in batches and resolve their futures.
+
+        Every message taken off the queue gets a result or an exception, even
+        when a batch fails or the worker is cancelled.
+        """
+        while True:
+            batch = [await queue.get()]
+            try:
+                # Give concurrent requests a moment to join this batch
+                await asyncio.sleep(MAX_BATCH_WAIT_MS / 1000)
+                while len(batch) < MAX_BATCH_SIZE and not queue.empty():
+                    batch.append(queue.get_nowait())
+
+                messages = [message for message, _ in batch]
+                # Off the event loop so other requests keep making progress
+                probabilities = await asyncio.to_thread(self._predict_proba, messages)
+                for (_, future), row in zip(batch, probabilities, strict=True):
+                    if not future.done():
+                        future.set_result(row)
+            except asyncio.CancelledError:
+                _fail_futures(batch, RuntimeError("Classifier worker stopped"))
+                raise
+            except Exception as exc:
+                _fail_futures(batch, exc)
+
     def process_message(
         self, message: str, session_id: str | None = None
     ) -> dict[str, Any]:
@@ -637,68 +1091,76 @@ class ChatbotProcessor:
         enhanced_message = self._enhance_message_with_context(message, session_id)
 
         clean_message = enhanced_message.lower()
-        classifications = self.get_classifications(clean_message)
+        intent, confidence = self.classify(clean_message)
+        return self._respond(message, clean_message, session_id, intent, confidence)
 
-        intent = "unknown"
-        confidence = 0.0
+    async def process_message_async(
+        self, message: str, session_id: str | None = None
+    ) -> dict[str, Any]:
+        """Like process_message, but classifies through the batching worker."""
+        enhanced_message = self._enhance_message_with_context(message, session_id)
 
-        if classifications:
-            top_classification = classifications[0]
-            confidence = top_classification["value"]
+        clean_message = enhanced_message.lower()
+        intent, confidence = await self.classify_async(clean_message)
+        # Entity matching and response generation are cheap; keep them inline
+        return self._respond(message, clean_message, session_id, intent, confidence)
+
+    def process_messages(
+        self, messages: list[str], session_ids: list[str | None] | None = None
+    ) -> list[dict[str, Any]]:
+        """Process a batch of messages with a single classifier call.
+
+        Returns what process_message would for each message, in order. Every
+        message is enhanced with its session's context as it stood before the
+        batch, so turns that build on each other belong in process_message.
+        """
+        if session_ids is None:
+            session_ids = [None] * len(messages)
+        clean_messages = [
+            self._enhance_message_with_context(message, session_id).lower()
+            for message, session_id in zip(messages, session_ids, strict=True)
+        ]
+        top_intents = self._top_intents(clean_messages)
+        return [
+            self._respond(message, clean_message, session_id, intent, confidence)
+            for message, clean_message, session_id, (intent, confidence) in zip(
+                messages, clean_messages, session_ids, top_intents, strict=True
+            )
+        ]
 
-            # Confidence gating: only accept high-confidence predictions
-            if confidence >= CONFIDENCE_THRESHOLD:
-                intent = top_classification["label"]
-            else:
-                intent = "unknown"
-        else:
+    def _respond(
+        self,
+        message: str,
+        clean_message: str,
+        session_id: str | None,
+        intent: str,
+        confidence: float,
+    ) -> dict[str, Any]:
+        """Gate the classified intent, extract entities and build the reply."""
+        # Confidence gating: only accept high-confidence predictions
+        if confidence < CONFIDENCE_THRESHOLD:
             intent = "unknown"
 
         # --- Enhanced Entity Recognition ---
         entities = self._find_entities_in_text(clean_message)
 
         # --- Entity-based Intent Override ---
-        # If we have entities but low confidence, override the intent based on entity types
-        if entities and confidence < CONFIDENCE_THRESHOLD:
-            entity_types = [e["type"] for e in entities]
-            if "album" in entity_types:
-                intent = "album.info"
-                confidence = (
-                    0.5  # Set a reasonable confidence for entity-based detection
-                )
-            elif "song" in entity_types:
-                intent = "song.info"
-                confidence = 0.5
-            elif "member" in entity_types:
-                intent = "member.biography"
-                confidence = 0.5
-
-        # --- Entity-based Intent Override (Enhanced) ---
-        # Also override when we have entities but the intent doesn't match the entity types
+        # Override the intent when it doesn't fit the entities we found. This
+        # also covers low-confidence predictions, which are gated to "unknown"
+        # above and so never match.
         if entities:
-            entity_types = [e["type"] for e in entities]
-            intent_matches_entities = (
-                ("album" in entity_types and intent in ["album.specific", "album.info"])
-                or (
-                    "song" in entity_types
-                    and intent in ["song.specific", "song.info", "song.lyrics"]
-                )
-                or (
-                    "member" in entity_types
-                    and intent in ["member.biography", "band.members"]
-                )
+            entity_types = {e["type"] for e in entities}
+            intent_matches_entities = any(
+                intent in _ENTITY_TYPE_INTENTS[entity_type]
+                for entity_type in entity_types & _ENTITY_TYPE_INTENTS.keys()
             )
 
             if not intent_matches_entities:
-                if "album" in entity_types:
-                    intent = "album.info"
-                    confidence = 0.5
-                elif "song" in entity_types:
-                    intent = "song.info"
-                    confidence = 0.5
-                elif "member" in entity_types:
-                    intent = "member.biography"
-                    confidence = 0.5
+                for entity_type, override_intent in _ENTITY_OVERRIDE_INTENTS:
+                    if entity_type in entity_types:
+                        intent = override_intent
+                        confidence = ENTITY_OVERRIDE_CONFIDENCE
+                        break
 
         # --- Contextual Response Generation ---
         response_message = self._generate_contextual_response(
@@ -1,22 +1,56 @@
 import os
 from collections.abc import Generator
+from typing import Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 # Database URL - use SQLite for development, PostgreSQL for production
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./rhcp_chatbot.db")
 
+# Log every SQL statement; far too slow for the per-request auth lookups
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "false").lower() == "true"
+
+# Applied to every new file-backed SQLite connection: WAL lets readers run
+# alongside a writer, and NORMAL sync skips the fsync on each commit (still
+# safe in WAL mode, a crash can only lose the latest transactions)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
 # Create engine
 if DATABASE_URL.startswith("sqlite"):
     # SQLite configuration for development
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=True,  # Set to False in production
-    )
+    if make_url(DATABASE_URL).database in (None, "", ":memory:"):
+        # An in-memory database only lives as long as its one connection
+        engine = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=DATABASE_ECHO,
+        )
+    else:
+        # File databases get SQLAlchemy's default connection pool
+        engine = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            echo=DATABASE_ECHO,
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
 else:
     # PostgreSQL configuration for production
     engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=False)
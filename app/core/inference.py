@@ -1,9 +1,12 @@
-from typing import Any, Literal
+import asyncio
+from functools import lru_cache
+from typing import Any, Literal, get_args
 
 from app.chatbot.memory import ConversationMemory
 from app.chatbot.processor import ChatbotProcessor
 from app.infra.logging import get_logger
 from app.knowledge.resolver import get_knowledge_resolver
+from app.knowledge.search import get_facts_by_canonical
 from app.schemas import Entity, ResponseModel
 
 # Type alias for valid intents
@@ -18,6 +21,13 @@ IntentType = Literal[
     "intent.outofscope",
     "unknown",
 ]
+VALID_INTENTS: frozenset[str] = frozenset(get_args(IntentType))
+VALID_ENTITY_TYPES: frozenset[str] = frozenset(
+    get_args(Entity.model_fields["type"].annotation)
+)
+
+# Classifier confidence below which the final intent is gated to "unknown"
+CONFIDENCE_GATING_THRESHOLD = 0.60
 
 logger = get_logger(__name__)
 
@@ -25,6 +35,9 @@ logger = get_logger(__name__)
 chatbot_processor: ChatbotProcessor | None = None
 memory_manager: ConversationMemory | None = None
 
+# Number of lowercased messages whose analysis run_inference remembers
+INFERENCE_CACHE_SIZE = 512
+
 
 def initialize_inference(
     processor: ChatbotProcessor, memory: ConversationMemory
@@ -33,9 +46,19 @@ def initialize_inference(
     global chatbot_processor, memory_manager
     chatbot_processor = processor
     memory_manager = memory
+    clear_inference_cache()
+
+    # Load the knowledge base now instead of on the first request that
+    # mentions an entity
+    get_knowledge_resolver()
     logger.info("Inference pipeline initialized")
 
 
+def clear_inference_cache() -> None:
+    """Forget cached message analyses, e.g. after swapping the processor."""
+    _analyze.cache_clear()
+
+
 def classify(message: str) -> tuple[str, float, list[dict[str, Any]]]:
     """
     Run classification on the input message.
@@ -43,26 +66,44 @@ def classify(message: str) -> tuple[str, float, list[dict[str, Any]]]:
     Returns:
         tuple: (raw_intent, raw_confidence, raw_entities)
     """
-    if not chatbot_processor:
-        raise RuntimeError("Inference pipeline not initialized")
+    return _classify_clean(message.lower())
 
-    # Get raw classifications
-    classifications = chatbot_processor.get_classifications(message.lower())
 
-    if not classifications:
-        return "unknown", 0.0, []
+def _classify_clean(clean_message: str) -> tuple[str, float, list[dict[str, Any]]]:
+    """Run classification on a message that is already lowercased."""
+    if not chatbot_processor:
+        raise RuntimeError("Inference pipeline not initialized")
 
-    top_classification = classifications[0]
-    raw_intent = top_classification["label"]
-    raw_confidence = top_classification["value"]
+    # Only the top-1 class is needed here, so skip ranking the full list;
+    # empty messages and bare greetings skip the classifier altogether
+    raw_intent, raw_confidence = chatbot_processor.classify(clean_message)
 
     # Get raw entities
-    raw_entities = chatbot_processor._find_entities_in_text(message.lower())
+    raw_entities = chatbot_processor._find_entities_in_text(clean_message)
 
-    logger.debug(f"Raw classification: {raw_intent} ({raw_confidence:.3f})")
+    logger.debug("Raw classification: %s (%.3f)", raw_intent, raw_confidence)
     return raw_intent, raw_confidence, raw_entities
 
 
+def classify_batch(messages: list[str]) -> list[tuple[str, float, list[dict[str, Any]]]]:
+    """
+    Run classification on several messages with a single classifier call.
+
+    Returns:
+        list: one (raw_intent, raw_confidence, raw_entities) tuple per message
+    """
+    if not chatbot_processor:
+        raise RuntimeError("Inference pipeline not initialized")
+
+    lowered = [message.lower() for message in messages]
+    top_intents = chatbot_processor._top_intents(lowered)
+
+    return [
+        (raw_intent, raw_confidence, chatbot_processor._find_entities_in_text(message))
+        for message, (raw_intent, raw_confidence) in zip(lowered, top_intents, strict=True)
+    ]
+
+
 def apply_confidence_gating(
     raw_intent: str, raw_confidence: float
 ) -> tuple[IntentType, float]:
@@ -76,32 +117,19 @@ def apply_confidence_gating(
     Returns:
         tuple: (final_intent, final_confidence)
     """
-    CONFIDENCE_THRESHOLD = 0.60
-
-    if raw_confidence >= CONFIDENCE_THRESHOLD:
+    if raw_confidence >= CONFIDENCE_GATING_THRESHOLD:
         # Validate that raw_intent is a valid IntentType
-        valid_intents = [
-            "greetings.hello",
-            "greetings.bye",
-            "member.biography",
-            "band.members",
-            "album.info",
-            "song.info",
-            "band.history",
-            "intent.outofscope",
-            "unknown",
-        ]
-        if raw_intent in valid_intents:
+        if raw_intent in VALID_INTENTS:
             final_intent: IntentType = raw_intent  # type: ignore
         else:
             final_intent: IntentType = "unknown"
         final_confidence = raw_confidence
-        logger.debug(f"Confidence gating: accepted {raw_intent} ({raw_confidence:.3f})")
+        logger.debug("Confidence gating: accepted %s (%.3f)", raw_intent, raw_confidence)
     else:
         final_intent: IntentType = "unknown"
         final_confidence = raw_confidence
         logger.debug(
-            f"Confidence gating: rejected {raw_intent} ({raw_confidence:.3f}) -> unknown"
+            "Confidence gating: rejected %s (%.3f) -> unknown", raw_intent, raw_confidence
         )
 
     return final_intent, final_confidence
@@ -117,15 +145,18 @@ def canonicalize_entities(raw_entities: list[dict[str, Any]]) -> list[Entity]:
     Returns:
         List of validated Entity objects
     """
-    canonical_entities = []
-    knowledge_resolver = get_knowledge_resolver()
+    canonical_entities: list[Entity] = []
+    if not raw_entities:
+        return canonical_entities
 
+    # Validate entities first so each distinct span is resolved only once
+    pending = []
     for raw_entity in raw_entities:
         try:
             # Validate entity type
             entity_type = raw_entity.get("type")
-            if entity_type not in ["member", "album", "song", "band"]:
-                logger.warning(f"Skipping invalid entity type: {entity_type}")
+            if entity_type not in VALID_ENTITY_TYPES:
+                logger.warning("Skipping invalid entity type: %s", entity_type)
                 continue
 
             # Get the raw value from the entity
@@ -134,15 +165,33 @@ def canonicalize_entities(raw_entities: list[dict[str, Any]]) -> list[Entity]:
                 span = raw_value.get("text", "")
             else:
                 span = str(raw_value)
+        except Exception as e:
+            logger.warning("Failed to canonicalize entity %s: %s", raw_entity, e)
+            continue
 
-            # Use knowledge resolver to get canonical entity
-            canonical_entity = None
-            if entity_type == "member":
-                canonical_entity = knowledge_resolver.resolve_member(span)
-            elif entity_type == "album":
-                canonical_entity = knowledge_resolver.resolve_album(span)
-            elif entity_type == "song":
-                canonical_entity = knowledge_resolver.resolve_song(span)
+        pending.append((raw_entity, entity_type, raw_value, span))
+
+    # Use knowledge resolver to get canonical entities
+    knowledge_resolver = get_knowledge_resolver()
+    resolvers = {
+        "member": knowledge_resolver.resolve_member,
+        "album": knowledge_resolver.resolve_album,
+        "song": knowledge_resolver.resolve_song,
+    }
+    resolved: dict[tuple[str, str], Any] = {}
+    for entity_type, span in dict.fromkeys((item[1], item[3]) for item in pending):
+        if entity_type in resolvers:
+            try:
+                resolved[(entity_type, span)] = resolvers[entity_type](span)
+            except Exception as e:
+                # Leave it out of resolved; its entities are skipped below
+                logger.warning("Failed to resolve %s '%s': %s", entity_type, span, e)
+
+    for raw_entity, entity_type, raw_value, span in pending:
+        try:
+            if entity_type in resolvers and (entity_type, span) not in resolved:
+                continue
+            canonical_entity = resolved.get((entity_type, span))
 
             # Create validated Entity with resolved data
             if canonical_entity:
@@ -152,7 +201,7 @@ def canonicalize_entities(raw_entities: list[dict[str, Any]]) -> list[Entity]:
                     confidence=raw_entity.get("confidence", 0.5),
                 )
                 canonical_entities.append(entity)
-                logger.debug(f"Resolved entity '{span}' to canonical '{canonical_entity.get('name', canonical_entity.get('title', span))}'")
+                logger.debug("Resolved entity '%s' to canonical '%s'", span, canonical_entity.get('name', canonical_entity.get('title', span)))
             else:
                 # Fallback to original entity if resolution fails
                 entity = Entity(
@@ -161,14 +210,14 @@ def canonicalize_entities(raw_entities: list[dict[str, Any]]) -> list[Entity]:
                     confidence=raw_entity.get("confidence", 0.5),
                 )
                 canonical_entities.append(entity)
-                logger.debug(f"Could not resolve entity '{span}', using original")
+                logger.debug("Could not resolve entity '%s', using original", span)
 
         except Exception as e:
-            logger.warning(f"Failed to canonicalize entity {raw_entity}: {e}")
+            logger.warning("Failed to canonicalize entity %s: %s", raw_entity, e)
             continue
 
     logger.debug(
-        f"Canonicalized {len(canonical_entities)} entities from {len(raw_entities)} raw entities"
+        "Canonicalized %d entities from %d raw entities", len(canonical_entities), len(raw_entities)
     )
     return canonical_entities
 
@@ -208,7 +257,7 @@ def build_response(
         else:
             # Use the processor to generate contextual response
             final_message = chatbot_processor._generate_contextual_response(
-                "", final_intent, [e.dict() for e in canonical_entities], session_id
+                "", final_intent, _entity_dicts(canonical_entities), session_id
             )
 
     # Create ResponseModel
@@ -221,10 +270,20 @@ def build_response(
         raw_confidence=raw_confidence,
     )
 
-    logger.info(f"Final response: {final_intent} ({final_confidence:.3f})")
+    logger.info("Final response: %s (%.3f)", final_intent, final_confidence)
     return response
 
 
+def _entity_dicts(entities: list[Entity]) -> list[dict[str, Any]]:
+    """
+    Convert entities to plain dicts for the processor and memory.
+
+    Both only read the dicts, so the values are shared instead of dumping
+    a copy of every knowledge-base record per request.
+    """
+    return [{"type": e.type, "value": e.value, "confidence": e.confidence} for e in entities]
+
+
 def _build_factual_response(intent: IntentType, entities: list[Entity]) -> str:
     """
     Build a factual response using retrieved facts from the knowledge base.
@@ -237,8 +296,6 @@ def _build_factual_response(intent: IntentType, entities: list[Entity]) -> str:
         Factual response message
     """
     try:
-        from app.knowledge.search import get_facts_by_canonical
-        
         if not entities:
             return "I don't have enough information to answer that question."
         
@@ -280,50 +337,59 @@ def _build_factual_response(intent: IntentType, entities: list[Entity]) -> str:
             return _build_generic_response(facts, canonical, entity_type)
             
     except Exception as e:
-        logger.warning(f"Failed to build factual response: {e}")
+        logger.warning("Failed to build factual response: %s", e)
         # Fallback to generic response
         return f"I have information about {entities[0].value if entities else 'this topic'}, but I'm having trouble retrieving the details right now."
 
 
+def _collect_fields(
+    facts: list, fields: tuple[str, ...], multi: tuple[str, ...] = ()
+) -> dict[str, Any]:
+    """
+    Pick the fields a response needs out of a list of facts.
+
+    Args:
+        facts: Facts retrieved for one entity
+        fields: Single-valued fields; the last fact for each wins
+        multi: Fields that collect every value, in order
+
+    Returns:
+        Dict with every requested field; missing single-valued fields are None
+    """
+    values: dict[str, Any] = dict.fromkeys(fields)
+    lists: dict[str, list] = {field: [] for field in multi}
+    for fact in facts:
+        if fact.field in lists:
+            lists[fact.field].append(fact.value)
+        elif fact.field in values:
+            values[fact.field] = fact.value
+    values.update(lists)
+    return values
+
+
 def _build_member_response(facts: list, canonical: str) -> str:
     """Build a factual response for member queries."""
     # Extract key facts
-    name = ""
-    roles = []
-    join_year = None
-    active = None
-    notes = ""
-    
-    for fact in facts:
-        if fact.field == "name":
-            name = fact.value
-        elif fact.field == "role":
-            roles.append(fact.value)
-        elif fact.field == "join_year":
-            join_year = fact.value
-        elif fact.field == "active":
-            active = fact.value
-        elif fact.field == "notes":
-            notes = fact.value
+    fields = _collect_fields(facts, ("name", "join_year", "active", "notes"), multi=("role",))
     
     # Build response
     response_parts = []
     
-    if name:
-        response_parts.append(f"{name}")
+    if fields["name"]:
+        response_parts.append(f"{fields['name']}")
     
-    if roles:
-        response_parts.append(f"plays {', '.join(roles)}")
+    if fields["role"]:
+        response_parts.append(f"plays {', '.join(fields['role'])}")
     
-    if join_year:
-        response_parts.append(f"joined in {join_year}")
+    if fields["join_year"]:
+        response_parts.append(f"joined in {fields['join_year']}")
     
-    if active is not None:
-        status = "currently active" if active.lower() == "true" else "not currently active"
+    if fields["active"] is not None:
+        status = "currently active" if fields["active"].lower() == "true" else "not currently active"
         response_parts.append(f"is {status}")
     
-    if notes:
-        response_parts.append(f"Note: {notes}")
+    if fields["notes"]:
+        response_parts.append(f"Note: {fields['notes']}")
     
     if response_parts:
         return " is ".join(response_parts) + "."
@@ -334,41 +400,25 @@ def _build_member_response(facts: list, canonical: str) -> str:
 def _build_album_response(facts: list, canonical: str) -> str:
     """Build a factual response for album queries."""
     # Extract key facts
-    title = ""
-    year = None
-    label = ""
-    tracks = None
-    notes = ""
-    
-    for fact in facts:
-        if fact.field == "title":
-            title = fact.value
-        elif fact.field == "year":
-            year = fact.value
-        elif fact.field == "label":
-            label = fact.value
-        elif fact.field == "tracks":
-            tracks = fact.value
-        elif fact.field == "notes":
-            notes = fact.value
+    fields = _collect_fields(facts, ("title", "year", "label", "tracks", "notes"))
     
     # Build response
     response_parts = []
     
-    if title:
-        response_parts.append(f"{title}")
+    if fields["title"]:
+        response_parts.append(f"{fields['title']}")
     
-    if year:
-        response_parts.append(f"released in {year}")
+    if fields["year"]:
+        response_parts.append(f"released in {fields['year']}")
     
-    if label:
-        response_parts.append(f"on {label}")
+    if fields["label"]:
+        response_parts.append(f"on {fields['label']}")
     
-    if tracks:
-        response_parts.append(f"has {tracks} tracks")
+    if fields["tracks"]:
+        response_parts.append(f"has {fields['tracks']} tracks")
     
-    if notes:
-        response_parts.append(f"Note: {notes}")
+    if fields["notes"]:
+        response_parts.append(f"Note: {fields['notes']}")
     
     if response_parts:
         return " is ".join(response_parts) + "."
@@ -379,41 +429,25 @@ def _build_album_response(facts: list, canonical: str) -> str:
 def _build_song_response(facts: list, canonical: str) -> str:
     """Build a factual response for song queries."""
     # Extract key facts
-    title = ""
-    year = None
-    album = ""
-    track_no = None
-    notes = ""
-    
-    for fact in facts:
-        if fact.field == "title":
-            title = fact.value
-        elif fact.field == "year":
-            year = fact.value
-        elif fact.field == "album":
-            album = fact.value
-        elif fact.field == "track_no":
-            track_no = fact.value
-        elif fact.field == "notes":
-            notes = fact.value
+    fields = _collect_fields(facts, ("title", "year", "album", "track_no", "notes"))
     
     # Build response
     response_parts = []
     
-    if title:
-        response_parts.append(f"{title}")
+    if fields["title"]:
+        response_parts.append(f"{fields['title']}")
     
-    if year:
-        response_parts.append(f"released in {year}")
+    if fields["year"]:
+        response_parts.append(f"released in {fields['year']}")
     
-    if album:
-        response_parts.append(f"from the album {album}")
+    if fields["album"]:
+        response_parts.append(f"from the album {fields['album']}")
     
-    if track_no:
-        response_parts.append(f"track {track_no}")
+    if fields["track_no"]:
+        response_parts.append(f"track {fields['track_no']}")
     
-    if notes:
-        response_parts.append(f"Note: {notes}")
+    if fields["notes"]:
+        response_parts.append(f"Note: {fields['notes']}")
     
     if response_parts:
         return " is ".join(response_parts) + "."
@@ -435,7 +469,8 @@ def _build_generic_response(facts: list, canonical: str, entity_type: str) -> st
     for field, values in field_values.items():
         if field in ["name", "title"]:  # Skip redundant fields
             continue
-        unique_values = list(set(values))
+        # Drop repeats but keep the order the facts came in
+        unique_values = list(dict.fromkeys(values))
         if len(unique_values) == 1:
             response_parts.append(f"{field}: {unique_values[0]}")
         else:
@@ -447,6 +482,29 @@ def _build_generic_response(facts: list, canonical: str, entity_type: str) -> st
         return f"I have basic information about {canonical} but not many details."
 
 
+@lru_cache(maxsize=INFERENCE_CACHE_SIZE)
+def _analyze(
+    clean_message: str, raw_intent: str, raw_confidence: float
+) -> tuple[IntentType, float, tuple[Entity, ...]]:
+    """
+    Gate a classified lowercased message and canonicalize its entities.
+
+    None of these steps depend on the session, so results are shared by every
+    caller; the entities are returned as a tuple and must not be modified, so
+    callers hand out copies of them.
+
+    Returns:
+        tuple: (final_intent, final_confidence, canonical_entities)
+    """
+    if not chatbot_processor:
+        raise RuntimeError("Inference pipeline not initialized")
+
+    final_intent, final_confidence = apply_confidence_gating(raw_intent, raw_confidence)
+    raw_entities = chatbot_processor._find_entities_in_text(clean_message)
+    canonical_entities = tuple(canonicalize_entities(raw_entities))
+    return final_intent, final_confidence, canonical_entities
+
+
 def run_inference(message: str, session_id: str | None = None) -> ResponseModel:
     """
     Run the complete inference pipeline.
@@ -461,24 +519,71 @@ def run_inference(message: str, session_id: str | None = None) -> ResponseModel:
     if not chatbot_processor:
         raise RuntimeError("Inference pipeline not initialized")
 
-    logger.info(
-        f"Running inference on message: {message[:50]}{'...' if len(message) > 50 else ''}"
+    _log_message(message)
+
+    # Step 1: Classify (memoized by the processor; bare greetings skip the model)
+    clean_message = message.lower()
+    raw_intent, raw_confidence = chatbot_processor.classify(clean_message)
+    return _complete_inference(message, clean_message, raw_intent, raw_confidence, session_id)
+
+
+async def run_inference_async(message: str, session_id: str | None = None) -> ResponseModel:
+    """
+    Run the complete inference pipeline without blocking the event loop.
+
+    Classification goes through the processor's batching worker, so concurrent
+    requests share predict_proba calls. Entity resolution, fact lookups and the
+    memory update run in a worker thread, so other requests keep being served
+    while they do.
+
+    Args:
+        message: User input message
+        session_id: Optional session ID for context
+
+    Returns:
+        Validated ResponseModel
+    """
+    if not chatbot_processor:
+        raise RuntimeError("Inference pipeline not initialized")
+
+    _log_message(message)
+
+    clean_message = message.lower()
+    raw_intent, raw_confidence = await chatbot_processor.classify_async(clean_message)
+    return await asyncio.to_thread(
+        _complete_inference, message, clean_message, raw_intent, raw_confidence, session_id
     )
 
-    # Step 1: Classify
-    raw_intent, raw_confidence, raw_entities = classify(message)
 
-    # Step 2: Apply confidence gating
-    final_intent, final_confidence = apply_confidence_gating(raw_intent, raw_confidence)
+def _log_message(message: str) -> None:
+    """Log the start of an inference run."""
+    # %.50s truncates the message only if the record is actually emitted
+    logger.info(
+        "Running inference on message: %.50s%s", message, "..." if len(message) > 50 else ""
+    )
 
-    # Step 3: Canonicalize entities
-    canonical_entities = canonicalize_entities(raw_entities)
 
-    # Step 4: Build response
+def _complete_inference(
+    message: str,
+    clean_message: str,
+    raw_intent: str,
+    raw_confidence: float,
+    session_id: str | None,
+) -> ResponseModel:
+    """Run the steps after classification and record the exchange in memory."""
+    # Steps 2-3: Apply confidence gating and canonicalize entities (memoized
+    # per lowercased message and classification)
+    final_intent, final_confidence, canonical_entities = _analyze(
+        clean_message, raw_intent, raw_confidence
+    )
+
+    # Step 4: Build response (not cached: it varies with the session and
+    # picks among canned answers at random). The cached entities are copied so
+    # neither the response nor the memory record built from it shares them.
     response = build_response(
         final_intent,
         final_confidence,
-        canonical_entities,
+        [entity.model_copy(deep=True) for entity in canonical_entities],
         raw_intent,
         raw_confidence,
         session_id,
@@ -487,8 +592,45 @@ def run_inference(message: str, session_id: str | None = None) -> ResponseModel:
     # Update memory if session_id provided
     if session_id and memory_manager:
         try:
-            memory_manager.add_message(session_id, message, response.model_dump())
+            record = {**vars(response), "entities": _entity_dicts(response.entities)}
+            memory_manager.add_message(session_id, message, record)
         except Exception as e:
-            logger.warning(f"Failed to update memory for session {session_id}: {e}")
+            logger.warning("Failed to update memory for session %s: %s", session_id, e)
 
     return response
+
+
+def run_inference_batch(messages: list[str]) -> list[ResponseModel]:
+    """
+    Run the complete inference pipeline on several messages.
+
+    Classification is batched into one classifier call; gating, entity
+    canonicalization and response building still run per message. No session
+    is involved, so conversation memory is neither read nor updated.
+
+    Args:
+        messages: User input messages
+
+    Returns:
+        One validated ResponseModel per message, in order
+    """
+    if not chatbot_processor:
+        raise RuntimeError("Inference pipeline not initialized")
+
+    logger.info("Running batch inference on %d messages", len(messages))
+
+    responses = []
+    for raw_intent, raw_confidence, raw_entities in classify_batch(messages):
+        final_intent, final_confidence = apply_confidence_gating(raw_intent, raw_confidence)
+        canonical_entities = canonicalize_entities(raw_entities)
+        responses.append(
+            build_response(
+                final_intent,
+                final_confidence,
+                canonical_entities,
+                raw_intent,
+                raw_confidence,
+            )
+        )
+
+    return responses
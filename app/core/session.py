@@ -18,6 +18,6 @@ def get_session_id(request: Request) -> str:
 
     if not session_id:
         # Generate new session ID if not provided
-        session_id = str(uuid.uuid4())
+        session_id = uuid.uuid4().hex
 
     return session_id
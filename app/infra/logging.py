@@ -6,14 +6,50 @@ Provides JSON formatter, correlation IDs, and debug mode support.
 
 import json
 import logging
+import time
 from contextvars import ContextVar
-from datetime import datetime
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None  # type: ignore[assignment]
+
 # Context variables for request tracking
 request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
 correlation_id: ContextVar[str | None] = ContextVar("correlation_id", default=None)
 
+# Last whole second formatted by _utc_timestamp, as (second, "YYYY-MM-DDTHH:MM:SS")
+_last_utc_second: tuple[int, str] = (-1, "")
+
+
+def _utc_timestamp(created: float) -> str:
+    """Format an epoch time as ISO 8601 UTC with microseconds and a Z suffix.
+
+    Records arrive many per second, so the date and time part is formatted
+    once per second and reused.
+    """
+    global _last_utc_second
+    second = int(created)
+    cached_second, prefix = _last_utc_second
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _last_utc_second = (second, prefix)
+    return f"{prefix}.{int((created - second) * 1_000_000):06d}Z"
+
+
+def _dumps(log_entry: dict[str, Any]) -> str:
+    """Serialize a log entry, with orjson when it is installed.
+
+    Values orjson rejects (e.g. integers beyond 64 bits) go through json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(log_entry, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            pass
+    return json.dumps(log_entry)
+
 
 class JSONFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
@@ -21,7 +57,7 @@ class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_entry = {
-            "ts": datetime.utcnow().isoformat() + "Z",
+            "ts": _utc_timestamp(record.created),
             "level": record.levelname,
             "msg": record.getMessage(),
             "module": record.module,
@@ -47,7 +83,7 @@ class JSONFormatter(logging.Formatter):
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_entry)
+        return _dumps(log_entry)
 
 
 class HumanFormatter(logging.Formatter):
@@ -55,7 +91,10 @@ class HumanFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         """Format log record for human reading."""
-        timestamp = datetime.fromtimestamp(record.created).strftime("%H:%M:%S.%f")[:-3]
+        timestamp = (
+            f"{time.strftime('%H:%M:%S', time.localtime(record.created))}"
+            f".{int(record.msecs):03d}"
+        )
 
         # Base format
         fmt = f"[{timestamp}] {record.levelname:8} {record.module}:{record.lineno} - {record.getMessage()}"
@@ -4,10 +4,13 @@ This module provides functions to resolve user input spans (including typos,
 variants, and diacritics) to canonical entities from the knowledge base.
 """
 
+import operator
 import re
 import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any, Literal
+from typing import Dict, Optional, Union, Any, Literal
 import yaml  # type: ignore
 
 from app.infra.logging import get_logger
@@ -19,6 +22,127 @@ EntityType = Literal["member", "album", "song"]
 CanonicalEntity = Dict[str, Any]
 ResolutionResult = Optional[CanonicalEntity]
 
+# Number of distinct raw spans whose normalized form is remembered
+NORMALIZE_CACHE_SIZE = 8192
+# Number of normalized spans whose resolution is remembered, per entity type
+RESOLVE_CACHE_SIZE = 2048
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# libyaml's loader parses the knowledge base several times faster when available
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@dataclass
+class NameIndex:
+    """Normalized names of one entity type, computed when the entities are set."""
+    canonical: dict[str, CanonicalEntity]  # Normalized canonical name -> first entity with it
+    aliases: dict[str, CanonicalEntity]  # Normalized alias -> first entity with it
+    names: list[tuple[str, str, CanonicalEntity]]  # (name, phonetic key, entity), in fuzzy scan order
+
+
+# Common sound-alike patterns, applied in order
+PHONETIC_PATTERNS = (
+    ('f', 'ph'), ('c', 'k'), ('s', 'z'), ('x', 'ks'),
+    ('qu', 'kw'), ('tion', 'shun'), ('sion', 'zhun')
+)
+
+
+def _phonetic_key(text: str) -> str:
+    """Rewrite a normalized string with the sound-alike patterns."""
+    for pattern1, pattern2 in PHONETIC_PATTERNS:
+        text = text.replace(pattern1, pattern2)
+    return text
+
+
+def _score_normalized(span_norm: str, target_norm: str, span_phonetic: str, target_phonetic: str) -> float:
+    """Calculate similarity between two normalized spans (0.0 to 1.0).
+
+    The phonetic keys are passed in so a span scored against many targets
+    is only rewritten once.
+    """
+    if span_norm == target_norm:
+        return 1.0
+
+    # Check if span is contained in target or vice versa
+    if span_norm in target_norm or target_norm in span_norm:
+        return 0.8
+
+    # Positions that differ, for equal-length spans
+    same_length = len(span_norm) == len(target_norm)
+    diff_count = sum(map(operator.ne, span_norm, target_norm)) if same_length else 0
+
+    # Check for common typo patterns first (higher priority)
+    # Transposed characters (e.g., "teh" -> "the"); a swap changes exactly two positions
+    if same_length and diff_count == 2 and len(span_norm) >= 3:
+        for i in range(len(span_norm) - 1):
+            # Swap adjacent characters
+            swapped = span_norm[:i] + span_norm[i+1] + span_norm[i] + span_norm[i+2:]
+            if swapped == target_norm:
+                return 0.6
+
+    # Check for phonetic similarities (basic)
+    if span_phonetic == target_phonetic:
+        return 0.6
+
+    # Check for common typos (single character differences)
+    if same_length:
+        if diff_count == 1:
+            return 0.7
+        elif diff_count == 2:
+            return 0.5
+
+    # Check for length differences (insertions/deletions)
+    if abs(len(span_norm) - len(target_norm)) == 1:
+        # Check if one is a substring of the other
+        if span_norm in target_norm or target_norm in span_norm:
+            return 0.6
+
+        # Check for single character insertion/deletion (e.g., "fruciante" vs "frusciante")
+        shorter = span_norm if len(span_norm) < len(target_norm) else target_norm
+        longer = target_norm if len(span_norm) < len(target_norm) else span_norm
+
+        # Try removing one character at a time from the longer string
+        for i in range(len(longer)):
+            candidate = longer[:i] + longer[i+1:]
+            if candidate == shorter:
+                return 0.7
+
+    return 0.0
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_span(span: str | None) -> str:
+    """Normalize a span for comparison.
+
+    Args:
+        span: Raw span text
+
+    Returns:
+        Normalized span (lowercase, no diacritics, trimmed)
+    """
+    if not span:
+        return ""
+
+    # Convert to lowercase
+    normalized = span.lower()
+
+    # Remove diacritics (e.g., Björk -> Bjork); ASCII text has none
+    if not normalized.isascii():
+        normalized = unicodedata.normalize('NFD', normalized)
+        normalized = ''.join(c for c in normalized if not unicodedata.combining(c))
+
+    # Remove common punctuation that might interfere with matching
+    normalized = _PUNCTUATION_RE.sub('', normalized)
+
+    # Remove extra whitespace, including any the punctuation left behind,
+    # so normalizing a normalized span is a no-op
+    normalized = _WHITESPACE_RE.sub(' ', normalized).strip()
+
+    return normalized
+
+
 class KnowledgeResolver:
     """Resolves user spans to canonical entities from the knowledge base."""
     
@@ -29,11 +153,65 @@ class KnowledgeResolver:
             knowledge_dir: Path to knowledge base directory
         """
         self.knowledge_dir = Path(knowledge_dir)
-        self.members: List[CanonicalEntity] = []
-        self.albums: List[CanonicalEntity] = []
-        self.songs: List[CanonicalEntity] = []
+        self.members = []
+        self.albums = []
+        self.songs = []
         self._load_knowledge_base()
     
+    # Assigning an entity list rebuilds its name index, so lookups never
+    # re-normalize knowledge base strings, and starts a fresh resolution cache
+    @property
+    def members(self) -> list[CanonicalEntity]:
+        return self._members
+
+    @members.setter
+    def members(self, members: list[CanonicalEntity]) -> None:
+        self._members = members
+        self._member_index = self._build_name_index(members)
+        self._resolve_member_cached = lru_cache(maxsize=RESOLVE_CACHE_SIZE)(self._resolve_member)
+
+    @property
+    def albums(self) -> list[CanonicalEntity]:
+        return self._albums
+
+    @albums.setter
+    def albums(self, albums: list[CanonicalEntity]) -> None:
+        self._albums = albums
+        self._album_index = self._build_name_index(albums)
+        self._resolve_album_cached = lru_cache(maxsize=RESOLVE_CACHE_SIZE)(self._resolve_album)
+
+    @property
+    def songs(self) -> list[CanonicalEntity]:
+        return self._songs
+
+    @songs.setter
+    def songs(self, songs: list[CanonicalEntity]) -> None:
+        self._songs = songs
+        self._song_index = self._build_name_index(songs)
+        self._resolve_song_cached = lru_cache(maxsize=RESOLVE_CACHE_SIZE)(self._resolve_song)
+
+    def _build_name_index(self, entities: list[CanonicalEntity]) -> NameIndex:
+        """Normalize every canonical name and alias of an entity list once.
+
+        Args:
+            entities: Knowledge base entries of one type
+
+        Returns:
+            Name index over the entities
+        """
+        index = NameIndex(canonical={}, aliases={}, names=[])
+        for entity in entities:
+            normalized = self._normalize_span(entity['canonical'])
+            index.canonical.setdefault(normalized, entity)
+            if normalized:
+                index.names.append((normalized, _phonetic_key(normalized), entity))
+            for alias in entity.get('aliases', []):
+                normalized = self._normalize_span(alias)
+                index.aliases.setdefault(normalized, entity)
+                if normalized:
+                    index.names.append((normalized, _phonetic_key(normalized), entity))
+        return index
+
     def _load_knowledge_base(self) -> None:
         """Load all knowledge base files."""
         try:
@@ -41,7 +219,7 @@ class KnowledgeResolver:
             members_path = self.knowledge_dir / "members.yml"
             if members_path.exists():
                 with open(members_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
+                    data = yaml.load(f, Loader=_YAML_LOADER)
                     self.members = data.get('members', [])
                     logger.info(f"Loaded {len(self.members)} members from knowledge base")
             
@@ -49,7 +227,7 @@ class KnowledgeResolver:
             albums_path = self.knowledge_dir / "albums.yml"
             if albums_path.exists():
                 with open(albums_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
+                    data = yaml.load(f, Loader=_YAML_LOADER)
                     self.albums = data.get('albums', [])
                     logger.info(f"Loaded {len(self.albums)} albums from knowledge base")
             
@@ -57,7 +235,7 @@ class KnowledgeResolver:
             songs_path = self.knowledge_dir / "songs.yml"
             if songs_path.exists():
                 with open(songs_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
+                    data = yaml.load(f, Loader=_YAML_LOADER)
                     self.songs = data.get('songs', [])
                     logger.info(f"Loaded {len(self.songs)} songs from knowledge base")
                     
@@ -69,31 +247,8 @@ class KnowledgeResolver:
             self.songs = []
     
     def _normalize_span(self, span: str | None) -> str:
-        """Normalize a span for comparison.
-        
-        Args:
-            span: Raw span text
-            
-        Returns:
-            Normalized span (lowercase, no diacritics, trimmed)
-        """
-        if not span:
-            return ""
-        
-        # Convert to lowercase
-        normalized = span.lower().strip()
-        
-        # Remove diacritics (e.g., Björk -> Bjork)
-        normalized = unicodedata.normalize('NFD', normalized)
-        normalized = ''.join(c for c in normalized if not unicodedata.combining(c))
-        
-        # Remove extra whitespace
-        normalized = re.sub(r'\s+', ' ', normalized)
-        
-        # Remove common punctuation that might interfere with matching
-        normalized = re.sub(r'[^\w\s]', '', normalized)
-        
-        return normalized
+        """Normalize a span for comparison (see normalize_span)."""
+        return normalize_span(span)
     
     def _calculate_similarity(self, span: str, target: str) -> float:
         """Calculate similarity between span and target (0.0 to 1.0)."""
@@ -104,64 +259,7 @@ class KnowledgeResolver:
         span_norm = self._normalize_span(span)
         target_norm = self._normalize_span(target)
         
-        if span_norm == target_norm:
-            return 1.0
-        
-        # Check if span is contained in target or vice versa
-        if span_norm in target_norm or target_norm in span_norm:
-            return 0.8
-        
-        # Check for common typo patterns first (higher priority)
-        # Transposed characters (e.g., "teh" -> "the")
-        if len(span_norm) == len(target_norm) and len(span_norm) >= 3:
-            for i in range(len(span_norm) - 1):
-                # Swap adjacent characters
-                swapped = span_norm[:i] + span_norm[i+1] + span_norm[i] + span_norm[i+2:]
-                if swapped == target_norm:
-                    return 0.6
-        
-        # Check for phonetic similarities (basic)
-        # Common sound-alike patterns
-        phonetic_patterns = [
-            ('f', 'ph'), ('c', 'k'), ('s', 'z'), ('x', 'ks'),
-            ('qu', 'kw'), ('tion', 'shun'), ('sion', 'zhun')
-        ]
-        
-        span_phonetic = span_norm
-        target_phonetic = target_norm
-        
-        for pattern1, pattern2 in phonetic_patterns:
-            span_phonetic = span_phonetic.replace(pattern1, pattern2)
-            target_phonetic = target_phonetic.replace(pattern1, pattern2)
-        
-        if span_phonetic == target_phonetic:
-            return 0.6
-        
-        # Check for common typos (single character differences)
-        if len(span_norm) == len(target_norm):
-            diff_count = sum(1 for a, b in zip(span_norm, target_norm) if a != b)
-            if diff_count == 1:
-                return 0.7
-            elif diff_count == 2:
-                return 0.5
-        
-        # Check for length differences (insertions/deletions)
-        if abs(len(span_norm) - len(target_norm)) == 1:
-            # Check if one is a substring of the other
-            if span_norm in target_norm or target_norm in span_norm:
-                return 0.6
-            
-            # Check for single character insertion/deletion (e.g., "fruciante" vs "frusciante")
-            shorter = span_norm if len(span_norm) < len(target_norm) else target_norm
-            longer = target_norm if len(span_norm) < len(target_norm) else span_norm
-            
-            # Try removing one character at a time from the longer string
-            for i in range(len(longer)):
-                candidate = longer[:i] + longer[i+1:]
-                if candidate == shorter:
-                    return 0.7
-        
-        return 0.0
+        return _score_normalized(span_norm, target_norm, _phonetic_key(span_norm), _phonetic_key(target_norm))
     
     def resolve_member(self, span: str) -> ResolutionResult:
         """Resolve a span to a canonical member.
@@ -172,47 +270,41 @@ class KnowledgeResolver:
         Returns:
             Canonical member entity or None if not found
         """
-        normalized_span = self._normalize_span(span)
+        return self._resolve_member_cached(self._normalize_span(span))
+
+    def _resolve_member(self, normalized_span: str) -> ResolutionResult:
+        """Resolve a normalized span to a canonical member, uncached."""
+        index = self._member_index
         
         # First try exact matches with canonical names
-        for member in self.members:
-            if self._normalize_span(member['canonical']) == normalized_span:
-                logger.debug(f"Exact match for member: {span} -> {member['name']}")
-                return member
+        member = index.canonical.get(normalized_span)
+        if member is not None:
+            logger.debug(f"Exact match for member: {normalized_span} -> {member['name']}")
+            return member
         
         # Then try aliases
-        for member in self.members:
-            aliases = member.get('aliases', [])
-            for alias in aliases:
-                if self._normalize_span(alias) == normalized_span:
-                    logger.debug(f"Alias match for member: {span} -> {member['name']}")
-                    return member
+        member = index.aliases.get(normalized_span)
+        if member is not None:
+            logger.debug(f"Alias match for member: {normalized_span} -> {member['name']}")
+            return member
         
-        # Finally try fuzzy matching
+        # Finally try fuzzy matching over canonical names and aliases
         best_match = None
         best_score = 0.0
+        span_phonetic = _phonetic_key(normalized_span)
         
-        for member in self.members:
-            # Check canonical name
-            score = self._calculate_similarity(normalized_span, self._normalize_span(member['canonical']))
+        for name, phonetic, member in index.names if normalized_span else ():
+            score = _score_normalized(normalized_span, name, span_phonetic, phonetic)
             if score > best_score:
                 best_score = score
                 best_match = member
-            
-            # Check aliases
-            aliases = member.get('aliases', [])
-            for alias in aliases:
-                score = self._calculate_similarity(normalized_span, self._normalize_span(alias))
-                if score > best_score:
-                    best_score = score
-                    best_match = member
         
         # Only return if similarity is high enough and we have a match
         if best_match is not None and best_score >= 0.6:
-            logger.debug(f"Fuzzy match for member: {span} -> {best_match['name']} (score: {best_score})")
+            logger.debug(f"Fuzzy match for member: {normalized_span} -> {best_match['name']} (score: {best_score})")
             return best_match
         
-        logger.debug(f"No match found for member: {span}")
+        logger.debug(f"No match found for member: {normalized_span}")
         return None
     
     def resolve_album(self, span: str) -> ResolutionResult:
@@ -224,47 +316,41 @@ class KnowledgeResolver:
         Returns:
             Canonical album entity or None if not found
         """
-        normalized_span = self._normalize_span(span)
+        return self._resolve_album_cached(self._normalize_span(span))
+
+    def _resolve_album(self, normalized_span: str) -> ResolutionResult:
+        """Resolve a normalized span to a canonical album, uncached."""
+        index = self._album_index
         
         # First try exact matches with canonical names
-        for album in self.albums:
-            if self._normalize_span(album['canonical']) == normalized_span:
-                logger.debug(f"Exact match for album: {span} -> {album['title']}")
-                return album
+        album = index.canonical.get(normalized_span)
+        if album is not None:
+            logger.debug(f"Exact match for album: {normalized_span} -> {album['title']}")
+            return album
         
         # Then try aliases
-        for album in self.albums:
-            aliases = album.get('aliases', [])
-            for alias in aliases:
-                if self._normalize_span(alias) == normalized_span:
-                    logger.debug(f"Alias match for album: {span} -> {album['title']}")
-                    return album
+        album = index.aliases.get(normalized_span)
+        if album is not None:
+            logger.debug(f"Alias match for album: {normalized_span} -> {album['title']}")
+            return album
         
-        # Finally try fuzzy matching
+        # Finally try fuzzy matching over canonical names and aliases
         best_match = None
         best_score = 0.0
+        span_phonetic = _phonetic_key(normalized_span)
         
-        for album in self.albums:
-            # Check canonical name
-            score = self._calculate_similarity(normalized_span, self._normalize_span(album['canonical']))
+        for name, phonetic, album in index.names if normalized_span else ():
+            score = _score_normalized(normalized_span, name, span_phonetic, phonetic)
             if score > best_score:
                 best_score = score
                 best_match = album
-            
-            # Check aliases
-            aliases = album.get('aliases', [])
-            for alias in aliases:
-                score = self._calculate_similarity(normalized_span, self._normalize_span(alias))
-                if score > best_score:
-                    best_score = score
-                    best_match = album
         
         # Only return if similarity is high enough and we have a match
         if best_match is not None and best_score >= 0.6:
-            logger.debug(f"Fuzzy match for album: {span} -> {best_match['title']} (score: {best_score})")
+            logger.debug(f"Fuzzy match for album: {normalized_span} -> {best_match['title']} (score: {best_score})")
             return best_match
         
-        logger.debug(f"No match found for album: {span}")
+        logger.debug(f"No match found for album: {normalized_span}")
         return None
     
     def resolve_song(self, span: str) -> ResolutionResult:
@@ -276,47 +362,41 @@ class KnowledgeResolver:
         Returns:
             Canonical song entity or None if not found
         """
-        normalized_span = self._normalize_span(span)
+        return self._resolve_song_cached(self._normalize_span(span))
+
+    def _resolve_song(self, normalized_span: str) -> ResolutionResult:
+        """Resolve a normalized span to a canonical song, uncached."""
+        index = self._song_index
         
         # First try exact matches with canonical names
-        for song in self.songs:
-            if self._normalize_span(song['canonical']) == normalized_span:
-                logger.debug(f"Exact match for song: {span} -> {song['title']}")
-                return song
+        song = index.canonical.get(normalized_span)
+        if song is not None:
+            logger.debug(f"Exact match for song: {normalized_span} -> {song['title']}")
+            return song
         
         # Then try aliases
-        for song in self.songs:
-            aliases = song.get('aliases', [])
-            for alias in aliases:
-                if self._normalize_span(alias) == normalized_span:
-                    logger.debug(f"Alias match for song: {span} -> {song['title']}")
-                    return song
+        song = index.aliases.get(normalized_span)
+        if song is not None:
+            logger.debug(f"Alias match for song: {normalized_span} -> {song['title']}")
+            return song
         
-        # Finally try fuzzy matching
+        # Finally try fuzzy matching over canonical names and aliases
         best_match = None
         best_score = 0.0
+        span_phonetic = _phonetic_key(normalized_span)
         
-        for song in self.songs:
-            # Check canonical name
-            score = self._calculate_similarity(normalized_span, self._normalize_span(song['canonical']))
+        for name, phonetic, song in index.names if normalized_span else ():
+            score = _score_normalized(normalized_span, name, span_phonetic, phonetic)
             if score > best_score:
                 best_score = score
                 best_match = song
-            
-            # Check aliases
-            aliases = song.get('aliases', [])
-            for alias in aliases:
-                score = self._calculate_similarity(normalized_span, self._normalize_span(alias))
-                if score > best_score:
-                    best_score = score
-                    best_match = song
         
         # Only return if similarity is high enough and we have a match
         if best_match is not None and best_score >= 0.6:
-            logger.debug(f"Fuzzy match for song: {span} -> {best_match['title']} (score: {best_score})")
+            logger.debug(f"Fuzzy match for song: {normalized_span} -> {best_match['title']} (score: {best_score})")
             return best_match
         
-        logger.debug(f"No match found for song: {span}")
+        logger.debug(f"No match found for song: {normalized_span}")
         return None
     
     def resolve_entity(self, span: str, entity_type: Optional[EntityType] = None) -> ResolutionResult:
@@ -336,18 +416,13 @@ class KnowledgeResolver:
         elif entity_type == "song":
             return self.resolve_song(span)
         else:
-            # Try all types and return the best match
-            member_result = self.resolve_member(span)
-            album_result = self.resolve_album(span)
-            song_result = self.resolve_song(span)
-            
-            # Return the first non-None result, prioritizing members
-            if member_result:
-                return member_result
-            elif album_result:
-                return album_result
-            elif song_result:
-                return song_result
+            # Try all types, prioritizing members, and stop at the first match;
+            # the span only needs normalizing once
+            normalized_span = self._normalize_span(span)
+            for resolve in (self._resolve_member_cached, self._resolve_album_cached, self._resolve_song_cached):
+                result = resolve(normalized_span)
+                if result:
+                    return result
             
             return None
 
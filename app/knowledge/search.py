@@ -4,7 +4,12 @@ This module provides search capabilities for the RHCP knowledge base
 to reduce hallucination in responses by backing answers with searchable facts.
 """
 
+import queue
 import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
@@ -13,10 +18,63 @@ from app.infra.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Number of distinct full-text searches each engine remembers
+FACT_CACHE_SIZE = 1024
+# Number of connections each engine keeps for concurrent lookups
+CONNECTION_POOL_SIZE = 4
 
-@dataclass
+# Applied once to each of the engine's connections; lookups only ever read
+_CONNECTION_PRAGMAS = (
+    "PRAGMA query_only = 1",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+)
+
+# Query shapes, kept as constants so every call hits the connection's
+# statement cache with the exact same SQL text. Columns are selected in Fact
+# field order so rows can be passed to Fact positionally.
+_SQL_SEARCH_TYPED = """
+    SELECT
+        f.id, f.type, f.canonical, f.field, f.value, f.year, f.source,
+        bm25(facts_fts) as rank
+    FROM facts_fts
+    JOIN facts f ON f.id = facts_fts.rowid
+    WHERE facts_fts.type = ? AND facts_fts MATCH ?
+    ORDER BY rank, f.id
+    LIMIT ?
+"""
+_SQL_SEARCH_ANY = """
+    SELECT
+        f.id, f.type, f.canonical, f.field, f.value, f.year, f.source,
+        bm25(facts_fts) as rank
+    FROM facts_fts
+    JOIN facts f ON f.id = facts_fts.rowid
+    WHERE facts_fts MATCH ?
+    ORDER BY rank, f.id
+    LIMIT ?
+"""
+_SQL_ALL_FACTS = """
+    SELECT id, type, canonical, field, value, year, source, NULL as rank
+    FROM facts
+    ORDER BY field, value, id
+"""
+_SQL_BY_TYPE = """
+    SELECT id, type, canonical, field, value, year, source, NULL as rank
+    FROM facts
+    WHERE type = ?
+    ORDER BY canonical, field
+    LIMIT ?
+"""
+
+
+@dataclass(frozen=True)
 class Fact:
-    """A single factual piece of information."""
+    """A single factual piece of information.
+
+    Engines cache and index facts and hand the same instances to every
+    caller, so facts are immutable.
+    """
     id: int
     type: str  # 'member', 'album', 'song'
     canonical: str  # Canonical name/title
@@ -24,7 +82,7 @@ class Fact:
     value: str  # Field value
     year: Optional[int]  # Year (if applicable)
     source: str  # Source file
-    rank: Optional[float] = None  # FTS rank score
+    rank: float | None = None  # BM25 score from search_facts (lower is more relevant)
 
 
 class FactSearchEngine:
@@ -37,15 +95,78 @@ class FactSearchEngine:
             db_path: Path to the SQLite FTS database
         """
         self.db_path = Path(db_path)
-        self._validate_database()
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=CONNECTION_POOL_SIZE)
+        self._pool.put(self._connect())
+        try:
+            self._validate_database()
+        except Exception:
+            self.close()
+            raise
+        for _ in range(CONNECTION_POOL_SIZE - 1):
+            self._pool.put(self._connect())
+
+        # The facts are static while the engine is open, so repeated searches
+        # are served from memory; failures raise and are never cached
+        self._search_facts_cached = lru_cache(maxsize=FACT_CACHE_SIZE)(self._search_facts)
+        self._load_canonical_index()
     
-    def _validate_database(self) -> None:
-        """Validate that the database exists and has the expected schema."""
+    def _connect(self) -> sqlite3.Connection:
+        """Open one of the pooled connections."""
         if not self.db_path.exists():
             raise FileNotFoundError(f"FTS database not found: {self.db_path}")
         
+        # Requests are served from worker threads, so connections move between
+        # threads; the pool hands each one to a single user at a time
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection, waiting while all of them are in use."""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        """Close the pooled connections once lookups have finished."""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+    def clear_cache(self) -> None:
+        """Forget cached searches and reload the canonical index, e.g. after a rebuild."""
+        self._search_facts_cached.cache_clear()
+        self._load_canonical_index()
+
+    def _load_canonical_index(self) -> None:
+        """Group every fact by canonical name, and by canonical name and type."""
+        with self._connection() as conn:
+            rows = conn.execute(_SQL_ALL_FACTS).fetchall()
+
+        # Rows arrive ordered by field and value, so each group keeps the
+        # order a per-canonical query would return
+        by_canonical: dict[str, list[Fact]] = {}
+        by_canonical_type: dict[tuple[str, str], list[Fact]] = {}
+        for row in rows:
+            fact = Fact(*row)
+            by_canonical.setdefault(fact.canonical, []).append(fact)
+            by_canonical_type.setdefault((fact.canonical, fact.type), []).append(fact)
+
+        self._facts_by_canonical = by_canonical
+        self._facts_by_canonical_type = by_canonical_type
+        logger.debug(f"Indexed facts for {len(by_canonical)} canonical entities")
+
+    def _validate_database(self) -> None:
+        """Validate that the database has the expected schema."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
                 # Check if facts table exists
@@ -64,7 +185,7 @@ class FactSearchEngine:
                 if count == 0:
                     raise ValueError("Database has no facts")
                 
-                logger.info(f"FTS database validated: {count} facts available")
+            logger.info(f"FTS database validated: {count} facts available")
                 
         except Exception as e:
             logger.error(f"Database validation failed: {e}")
@@ -85,59 +206,64 @@ class FactSearchEngine:
             return []
         
         query = query.strip()
-        logger.debug(f"Searching for: '{query}' (k={k}, type={fact_type})")
-        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Build the search query - use simpler approach without rank function for now
-                if fact_type:
-                    # Filter by type and search in all text fields
-                    sql = """
-                    SELECT 
-                        f.id, f.type, f.canonical, f.field, f.value, f.year, f.source,
-                        NULL as rank
-                    FROM facts_fts
-                    JOIN facts f ON f.id = facts_fts.rowid
-                    WHERE facts_fts.type = ? AND facts_fts MATCH ?
-                    LIMIT ?
-                    """
-                    cursor.execute(sql, (fact_type, query, k))
-                else:
-                    # Search across all types
-                    sql = """
-                    SELECT 
-                        f.id, f.type, f.canonical, f.field, f.value, f.year, f.source,
-                        NULL as rank
-                    FROM facts_fts
-                    JOIN facts f ON f.id = facts_fts.rowid
-                    WHERE facts_fts MATCH ?
-                    LIMIT ?
-                    """
-                    cursor.execute(sql, (query, k))
-                
-                results = []
-                for row in cursor.fetchall():
-                    fact = Fact(
-                        id=row[0],
-                        type=row[1],
-                        canonical=row[2],
-                        field=row[3],
-                        value=row[4],
-                        year=row[5],
-                        source=row[6],
-                        rank=row[7]
-                    )
-                    results.append(fact)
-                
-                logger.debug(f"Found {len(results)} facts for query '{query}'")
-                return results
-                
+            # Callers get their own copy of the cached list
+            return list(self._search_facts_cached(query, k, fact_type))
         except Exception as e:
             logger.error(f"Search failed for query '{query}': {e}")
             return []
     
+    def _search_facts(self, query: str, k: int, fact_type: str | None) -> list[Fact]:
+        """Run a full-text search against the database (see search_facts)."""
+        logger.debug(f"Searching for: '{query}' (k={k}, type={fact_type})")
+
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            # Matches are ordered by BM25 relevance, best first
+            if fact_type:
+                # Filter by type and search in all text fields
+                cursor.execute(_SQL_SEARCH_TYPED, (fact_type, query, k))
+            else:
+                # Search across all types
+                cursor.execute(_SQL_SEARCH_ANY, (query, k))
+
+            results = [Fact(*row) for row in cursor.fetchall()]
+
+        logger.debug(f"Found {len(results)} facts for query '{query}'")
+        return results
+
+    def search_facts_batch(self, queries: list[tuple[str, int, str | None]]) -> list[list[Fact]]:
+        """Run several full-text searches on one borrowed connection.
+
+        Args:
+            queries: (query, k, fact_type) tuples, as taken by search_facts
+
+        Returns:
+            One list of matching facts per query, in the same order
+        """
+        results: list[list[Fact]] = []
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            for query, k, fact_type in queries:
+                query = query.strip() if query else ""
+                if not query:
+                    results.append([])
+                    continue
+
+                try:
+                    if fact_type:
+                        cursor.execute(_SQL_SEARCH_TYPED, (fact_type, query, k))
+                    else:
+                        cursor.execute(_SQL_SEARCH_ANY, (query, k))
+                    results.append([Fact(*row) for row in cursor.fetchall()])
+                except Exception as e:
+                    logger.error(f"Search failed for query '{query}': {e}")
+                    results.append([])
+
+        logger.debug(f"Ran {len(queries)} batched searches")
+        return results
+
     def get_facts_by_canonical(self, canonical: str, fact_type: Optional[str] = None) -> List[Fact]:
         """Get all facts for a specific canonical entity.
         
@@ -148,49 +274,15 @@ class FactSearchEngine:
         Returns:
             List of facts for the canonical entity
         """
-        logger.debug(f"Getting facts for canonical: '{canonical}' (type={fact_type})")
+        if fact_type:
+            facts = self._facts_by_canonical_type.get((canonical, fact_type), [])
+        else:
+            facts = self._facts_by_canonical.get(canonical, [])
         
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                if fact_type:
-                    sql = """
-                    SELECT id, type, canonical, field, value, year, source, NULL as rank
-                    FROM facts
-                    WHERE canonical = ? AND type = ?
-                    ORDER BY field, value
-                    """
-                    cursor.execute(sql, (canonical, fact_type))
-                else:
-                    sql = """
-                    SELECT id, type, canonical, field, value, year, source, NULL as rank
-                    FROM facts
-                    WHERE canonical = ?
-                    ORDER BY field, value
-                    """
-                    cursor.execute(sql, (canonical,))
-                
-                results = []
-                for row in cursor.fetchall():
-                    fact = Fact(
-                        id=row[0],
-                        type=row[1],
-                        canonical=row[2],
-                        field=row[3],
-                        value=row[4],
-                        year=row[5],
-                        source=row[6],
-                        rank=row[7]
-                    )
-                    results.append(fact)
-                
-                logger.debug(f"Found {len(results)} facts for canonical '{canonical}'")
-                return results
-                
-        except Exception as e:
-            logger.error(f"Failed to get facts for canonical '{canonical}': {e}")
-            return []
+        logger.debug("Found %d facts for canonical '%s' (type=%s)", len(facts), canonical, fact_type)
+        # Callers get their own copy of the indexed list; the facts in it are
+        # frozen, so the index cannot be changed through them
+        return list(facts)
     
     def get_facts_by_type(self, fact_type: str, limit: int = 100) -> List[Fact]:
         """Get facts of a specific type.
@@ -205,31 +297,12 @@ class FactSearchEngine:
         logger.debug(f"Getting {fact_type} facts (limit={limit})")
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
-                sql = """
-                SELECT id, type, canonical, field, value, year, source, NULL as rank
-                FROM facts
-                WHERE type = ?
-                ORDER BY canonical, field
-                LIMIT ?
-                """
-                cursor.execute(sql, (fact_type, limit))
+                cursor.execute(_SQL_BY_TYPE, (fact_type, limit))
                 
-                results = []
-                for row in cursor.fetchall():
-                    fact = Fact(
-                        id=row[0],
-                        type=row[1],
-                        canonical=row[2],
-                        field=row[3],
-                        value=row[4],
-                        year=row[5],
-                        source=row[6],
-                        rank=row[7]
-                    )
-                    results.append(fact)
+                results = [Fact(*row) for row in cursor.fetchall()]
                 
                 logger.debug(f"Found {len(results)} {fact_type} facts")
                 return results
@@ -245,7 +318,7 @@ class FactSearchEngine:
             Dictionary with database statistics
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
                 # Total facts
@@ -278,13 +351,18 @@ class FactSearchEngine:
 
 # Global search engine instance
 _search_engine: Optional[FactSearchEngine] = None
+# Requests run in worker threads; without this, concurrent first lookups
+# could each open an engine and its pooled connections
+_search_engine_lock = threading.Lock()
 
 
 def get_search_engine() -> FactSearchEngine:
     """Get the global search engine instance."""
     global _search_engine
     if _search_engine is None:
-        _search_engine = FactSearchEngine()
+        with _search_engine_lock:
+            if _search_engine is None:
+                _search_engine = FactSearchEngine()
     return _search_engine
 
 
@@ -302,6 +380,18 @@ def search_facts(query: str, k: int = 5, fact_type: Optional[str] = None) -> Lis
     return get_search_engine().search_facts(query, k, fact_type)
 
 
+def search_facts_batch(queries: list[tuple[str, int, str | None]]) -> list[list[Fact]]:
+    """Run several searches using the global search engine.
+
+    Args:
+        queries: (query, k, fact_type) tuples
+
+    Returns:
+        One list of matching facts per query
+    """
+    return get_search_engine().search_facts_batch(queries)
+
+
 def get_facts_by_canonical(canonical: str, fact_type: Optional[str] = None) -> List[Fact]:
     """Get facts for a canonical entity using the global search engine.
     
@@ -50,6 +50,9 @@ async def lifespan(app: FastAPI):
         # Initialize inference pipeline
         initialize_inference(chatbot_processor, memory_manager)
 
+        # Start the batching classifier worker used by /chat requests
+        chatbot_processor.start_worker()
+
         # Store in app state
         app.state.chatbot_processor = chatbot_processor
         app.state.memory_manager = memory_manager
@@ -64,6 +67,8 @@ async def lifespan(app: FastAPI):
 
     # Cleanup
     logger.info("Shutting down RHCP Chatbot application")
+    if chatbot_processor:
+        chatbot_processor.stop_worker()
     if memory_manager:
         memory_manager.cleanup_expired_sessions()
 
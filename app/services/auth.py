@@ -1,5 +1,8 @@
 import re
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -10,6 +13,13 @@ from sqlalchemy.orm import Session
 from app.core.config import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY
 from app.models.user import User, UserSession
 
+# Access tokens whose signature was already verified, mapped to their
+# (user id, expiry timestamp) and evicted least recently used first; the
+# user row is still loaded and checked on every request.
+TOKEN_CACHE_SIZE = 1024
+_token_cache: OrderedDict[str, tuple[int, float]] = OrderedDict()
+_token_cache_lock = threading.Lock()
+
 
 class AuthService:
     def __init__(self, db: Session):
@@ -96,13 +106,40 @@ class AuthService:
 
     def get_user_by_token(self, token: str) -> User | None:
         """Get user from JWT token."""
+        user_id = self._decode_user_id(token)
+        if user_id is None:
+            return None
+        user = self.db.query(User).filter(User.id == user_id).first()
+        return user if user and user.is_active else None
+
+    def _decode_user_id(self, token: str) -> int | None:
+        """Return the user id of a valid, unexpired token, or None.
+
+        Tokens are only decoded once; later calls are answered from the
+        token cache until the token expires.
+        """
+        with _token_cache_lock:
+            cached = _token_cache.get(token)
+            if cached is not None:
+                user_id, expires_at = cached
+                if expires_at > time.time():
+                    _token_cache.move_to_end(token)
+                    return user_id
+                del _token_cache[token]
+
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id = int(payload.get("sub"))
-            user = self.db.query(User).filter(User.id == user_id).first()
-            return user if user and user.is_active else None
         except jwt.PyJWTError:
             return None
+        user_id = int(payload.get("sub"))
+
+        # Tokens without an expiry are never cached
+        if "exp" in payload:
+            with _token_cache_lock:
+                _token_cache[token] = (user_id, float(payload["exp"]))
+                if len(_token_cache) > TOKEN_CACHE_SIZE:
+                    _token_cache.popitem(last=False)
+        return user_id
 
     def get_user_by_session(self, session_id: str) -> User | None:
         """Get user from session ID."""
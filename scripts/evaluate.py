@@ -27,7 +27,11 @@ from sklearn.metrics import (
 # Add app to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.core.inference import run_inference
+from app.core.inference import (
+    CONFIDENCE_GATING_THRESHOLD,
+    run_inference,
+    run_inference_batch,
+)
 from app.infra.logging import get_logger, setup_logging
 
 
@@ -94,6 +98,19 @@ def run_classification(
     predicted_intents = []
     confidence_scores = []
 
+    # Classify everything in one batch; fall back to one example at a time
+    # so a single bad example only costs its own prediction
+    try:
+        responses = run_inference_batch([example["text"] for example in examples])
+    except Exception as e:
+        logger.warning(f"Batch inference failed, retrying one by one: {e}")
+    else:
+        for example, response in zip(examples, responses, strict=True):
+            true_intents.append(example["intent"])
+            predicted_intents.append(response.intent)
+            confidence_scores.append(response.confidence)
+        return true_intents, predicted_intents, confidence_scores
+
     for i, example in enumerate(examples):
         try:
             # Run inference
@@ -120,7 +137,7 @@ def analyze_gating_performance(
     true_intents: list[str],
     predicted_intents: list[str],
     confidence_scores: list[float],
-    confidence_threshold: float = 0.60,
+    confidence_threshold: float = CONFIDENCE_GATING_THRESHOLD,
 ) -> dict[str, Any]:
     """Analyze low-confidence gating performance.
 
@@ -313,8 +330,11 @@ def main():
     parser.add_argument(
         "--confidence-threshold",
         type=float,
-        default=0.60,
-        help="Confidence threshold for gating analysis (default: 0.60)",
+        default=CONFIDENCE_GATING_THRESHOLD,
+        help=(
+            "Confidence threshold for gating analysis "
+            f"(default: {CONFIDENCE_GATING_THRESHOLD:.2f})"
+        ),
     )
     parser.add_argument("--output", help="Path to save detailed results JSON")
 
@@ -256,3 +256,37 @@ def test_chat_without_authentication(client):
     assert "intent" in data
     assert data["user_id"] is None
     assert data["username"] is None
+
+
+def test_access_token_is_decoded_once(monkeypatch):
+    """Test that a verified token is served from the token cache until it expires."""
+    import time
+
+    from app.models.user import User
+    from app.services import auth as auth_service_module
+
+    decoded = []
+    real_decode = auth_service_module.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decoded.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth_service_module.jwt, "decode", counting_decode)
+    monkeypatch.setattr(
+        auth_service_module, "_token_cache", type(auth_service_module._token_cache)()
+    )
+
+    service = auth_service_module.AuthService(db=None)
+    token = service.create_access_token(User(id=7, username="testuser", is_admin=False))
+
+    assert service._decode_user_id(token) == 7
+    assert service._decode_user_id(token) == 7
+    assert len(decoded) == 1
+
+    # An expired cache entry is dropped and the token verified again
+    auth_service_module._token_cache[token] = (7, time.time() - 1)
+    assert service._decode_user_id(token) == 7
+    assert len(decoded) == 2
+
+    assert service._decode_user_id("not-a-token") is None
@@ -359,3 +359,410 @@ def test_chatbot_processor_with_memory(chatbot_processor):
     # Check that conversation history is maintained
     history = memory_manager.get_conversation_history(session_id)
     assert len(history) == 2
+
+
+def test_entity_extraction_is_memoized(chatbot_processor):
+    """Repeated messages reuse the cached entity scan."""
+    first = chatbot_processor._find_entities_in_text("who is flea")
+    second = chatbot_processor._find_entities_in_text("who is flea")
+
+    assert first == second
+    # Callers get their own list so mutating it cannot poison the cache
+    assert first is not second
+    assert chatbot_processor._scan_entities_cached.cache_info().hits >= 1
+
+
+def test_entity_automaton_matches_trie_scan(chatbot_processor):
+    """The Aho-Corasick path finds the same entities as the trie fallback."""
+    if chatbot_processor._automaton is None:
+        pytest.skip("pyahocorasick not installed")
+
+    messages = [
+        "tell me about anthony kiedis and flea",
+        "what about californication?",
+        "snow (hey oh) from stadium arcadium",
+        "who wrote the songs on mother's milk",
+        "fleabag is not a band member",
+        "flea's café playlist: ürban otherside",
+        "",
+    ]
+    for message in messages:
+        assert chatbot_processor._match_with_automaton(
+            message
+        ) == chatbot_processor._match_with_trie(message)
+
+
+def test_entity_extraction_ignores_extra_whitespace(chatbot_processor):
+    """Irregular spacing does not hide multi-word entity names."""
+    entities = chatbot_processor._find_entities_in_text(
+        "tell me about  anthony \t kiedis"
+    )
+
+    assert [e["matched_text"] for e in entities] == ["anthony kiedis"]
+
+
+@pytest.mark.asyncio
+async def test_async_classifications_are_batched(chatbot_processor, monkeypatch):
+    """Concurrent async classifications share one predict_proba call."""
+    messages = ["who is flea", "tell me about californication", "hello", "bye"]
+    calls = []
+    predict_proba = chatbot_processor._predict_proba
+
+    def counting_predict_proba(batch):
+        calls.append(list(batch))
+        return predict_proba(batch)
+
+    monkeypatch.setattr(chatbot_processor, "_predict_proba", counting_predict_proba)
+    results = await asyncio.gather(
+        *(chatbot_processor.get_classifications_async(m) for m in messages)
+    )
+
+    assert calls == [messages]
+    for message, result in zip(messages, results, strict=True):
+        expected = chatbot_processor.get_classifications(message)
+        assert [c["label"] for c in result] == [c["label"] for c in expected]
+
+
+@pytest.mark.asyncio
+async def test_async_classification_survives_a_bad_batch(
+    chatbot_processor, monkeypatch
+):
+    """A batch that cannot be matched to its rows fails, and the next one works."""
+    predict_proba = chatbot_processor._predict_proba
+    monkeypatch.setattr(
+        chatbot_processor, "_predict_proba", lambda batch: predict_proba(batch)[:0]
+    )
+    with pytest.raises(ValueError):
+        await chatbot_processor.get_classifications_async("who is flea")
+
+    monkeypatch.setattr(chatbot_processor, "_predict_proba", predict_proba)
+    result = await chatbot_processor.get_classifications_async("who is flea")
+    expected = chatbot_processor.get_classifications("who is flea")
+    assert [c["label"] for c in result] == [c["label"] for c in expected]
+
+
+@pytest.mark.asyncio
+async def test_stop_worker_fails_waiting_classifications(chatbot_processor):
+    """Stopping the worker fails pending messages; later ones start a new worker."""
+    chatbot_processor.start_worker()
+    pending = asyncio.ensure_future(
+        chatbot_processor.get_classifications_async("who is flea")
+    )
+    await asyncio.sleep(0)
+    chatbot_processor.stop_worker()
+    with pytest.raises(RuntimeError, match="Classifier worker stopped"):
+        await pending
+
+    # A worker that died some other way is replaced as well
+    chatbot_processor.start_worker()
+    chatbot_processor._classify_task.cancel()
+    await asyncio.sleep(0)
+    result = await chatbot_processor.get_classifications_async("who is flea")
+    assert result[0]["label"] == chatbot_processor._top_intent("who is flea")[0]
+    chatbot_processor.stop_worker()
+
+
+def test_top_intent_matches_full_ranking(chatbot_processor):
+    """The argmax fast path and top-k ranking agree with the full sort."""
+    for message in ["who is flea", "tell me about californication", "hello"]:
+        ranking = chatbot_processor.get_classifications(message)
+        label, confidence = chatbot_processor._top_intent(message)
+        assert (label, confidence) == (ranking[0]["label"], ranking[0]["value"])
+        top_3 = chatbot_processor.get_classifications(message, top_k=3)
+        assert [c["label"] for c in top_3] == [c["label"] for c in ranking[:3]]
+
+
+def test_class_index_matches_classifier_classes(chatbot_processor):
+    classes = list(chatbot_processor.classifier.classes_)
+    assert list(chatbot_processor._classes) == classes
+    for label, index in chatbot_processor._class_index.items():
+        assert classes[index] == label
+
+
+def test_answers_by_intent_prefers_base_corpus(chatbot_processor):
+    training_data = chatbot_processor.training_data
+    for corpus_name in ("rhcp", "base"):
+        for item in training_data[corpus_name]["data"]:
+            if not item.get("answers"):
+                continue
+            base_item = next(
+                (
+                    i
+                    for i in training_data["base"]["data"]
+                    if i["intent"] == item["intent"]
+                ),
+                None,
+            )
+            expected = (
+                base_item["answers"]
+                if base_item and base_item.get("answers")
+                else item["answers"]
+            )
+            assert chatbot_processor._answers_by_intent[item["intent"]] == expected
+
+
+def test_follow_up_release_year_uses_name_index(chatbot_processor):
+    album = next(
+        a for a in chatbot_processor.known_albums if a["details"].get("releaseDate")
+    )
+    year = album["details"]["releaseDate"].split("-")[0]
+    response = chatbot_processor._handle_follow_up_question(
+        "in what year?", "album.info", [], {"last_album": album["name"].upper()}, []
+    )
+    assert response == f"{album['name'].upper()} was released in {year}."
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("In what year was it released?", True),
+        ("What about Flea?", True),
+        ("tell me about the band", True),
+        ("Who is Flea?", False),
+        ("hello", False),
+    ],
+)
+def test_is_follow_up_question(chatbot_processor, message, expected):
+    assert chatbot_processor._is_follow_up_question(message) is expected
+
+
+def test_entity_variations_are_frozen(chatbot_processor):
+    for entries in (
+        chatbot_processor.known_members,
+        chatbot_processor.known_albums,
+        chatbot_processor.known_songs,
+    ):
+        for entry in entries:
+            assert isinstance(entry["variations"], tuple)
+            assert entry["variations"][0] == entry["name"]
+            assert len(set(entry["variations"])) == len(entry["variations"])
+
+
+@pytest.mark.asyncio
+async def test_process_message_async_matches_sync(chatbot_processor):
+    chatbot_processor.start_worker()
+    messages = ["who is flea", "tell me about blood sugar sex magik", "bye"]
+    results = await asyncio.gather(
+        *(chatbot_processor.process_message_async(m) for m in messages)
+    )
+    for message, result in zip(messages, results, strict=True):
+        expected = chatbot_processor.process_message(message)
+        assert result["intent"] == expected["intent"]
+        assert result["confidence"] == pytest.approx(expected["confidence"])
+        assert result["entities"] == expected["entities"]
+
+
+def test_entity_prefilter_skips_the_scan(chatbot_processor):
+    before = chatbot_processor._scan_entities_cached.cache_info()
+    assert chatbot_processor._find_entities_in_text("?") == []
+    assert chatbot_processor._find_entities_in_text("123 456") == []
+    after = chatbot_processor._scan_entities_cached.cache_info()
+    assert (after.hits, after.misses) == (before.hits, before.misses)
+
+
+def test_entity_override_replaces_mismatched_intent(chatbot_processor, monkeypatch):
+    monkeypatch.setattr(
+        chatbot_processor,
+        "_top_intent_cached",
+        lambda message: ("greetings.hello", 0.9),
+    )
+    response = chatbot_processor.process_message("tell me about californication")
+    assert response["intent"] == "album.info"
+    assert response["confidence"] == 0.5
+
+    monkeypatch.setattr(
+        chatbot_processor,
+        "_top_intent_cached",
+        lambda message: ("greetings.hello", 0.01),
+    )
+    response = chatbot_processor.process_message("who is flea")
+    assert response["intent"] == "member.biography"
+    assert response["confidence"] == 0.5
+
+
+def test_seeded_processors_pick_the_same_answers(chatbot_processor):
+    from app.chatbot.processor import ChatbotProcessor
+
+    processors = [
+        ChatbotProcessor(
+            classifier=chatbot_processor.classifier,
+            training_data=chatbot_processor.training_data,
+            static_data=chatbot_processor.static_data,
+            seed=42,
+        )
+        for _ in range(2)
+    ]
+    intent = next(iter(chatbot_processor._answers_by_intent))
+    replies = [
+        [p._generate_basic_response(intent, []) for _ in range(5)] for p in processors
+    ]
+    assert replies[0] == replies[1]
+
+
+def test_linear_head_matches_pipeline_predict_proba(chatbot_processor):
+    import numpy as np
+
+    if chatbot_processor._linear_head is None:
+        pytest.skip("model is not a TF-IDF + multinomial logistic regression")
+    messages = ["who is flea", "hello there", "tell me about californication"]
+    np.testing.assert_allclose(
+        chatbot_processor._predict_proba(messages),
+        chatbot_processor.classifier.predict_proba(messages),
+    )
+
+
+def test_top_intent_is_memoized(chatbot_processor):
+    chatbot_processor._top_intent_cached.cache_clear()
+    first = chatbot_processor.process_message("Hello there")
+    second = chatbot_processor.process_message("hello there")
+    info = chatbot_processor._top_intent_cached.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert (first["intent"], first["confidence"]) == (
+        second["intent"],
+        second["confidence"],
+    )
+
+
+def test_entity_extraction_is_case_insensitive(chatbot_processor):
+    lower = chatbot_processor._find_entities_in_text("tell me about flea")
+    mixed = chatbot_processor._find_entities_in_text("Tell me about FLEA")
+    assert lower and mixed == lower
+
+
+def test_entity_trie_matches_word_boundary_regex(chatbot_processor):
+    """The trie fallback agrees with a plain \\b...\\b regex per variation."""
+    import re
+
+    messages = [
+        "tell me about anthony kiedis and flea",
+        "snow (hey oh) from stadium arcadium",
+        "fleabag is not a band member",
+        "cali, btw: under the bridge!",
+        "",
+    ]
+    specs = ("known_members", "known_albums", "known_songs")
+    for message in messages:
+        expected = {}
+        for spec_index, attr in enumerate(specs):
+            for entity_index, info in enumerate(getattr(chatbot_processor, attr)):
+                for variation_index, variation in enumerate(info["variations"]):
+                    if variation and re.search(
+                        r"\b" + re.escape(variation) + r"\b", message
+                    ):
+                        expected[(spec_index, entity_index)] = variation_index
+                        break
+        assert chatbot_processor._match_with_trie(message) == expected
+
+
+def test_album_response_uses_precomputed_track_preview(chatbot_processor):
+    from app.chatbot.processor import _ALBUM_TEMPLATES
+
+    entry = next(
+        a
+        for a in chatbot_processor.known_albums
+        if a["name"] not in _ALBUM_TEMPLATES and len(a["details"].get("tracks", [])) > 5
+    )
+    album = entry["details"]
+    response = chatbot_processor._generate_basic_response(
+        "album.specific", [{"type": "album", "value": album}]
+    )
+    assert response.endswith(
+        f"It includes tracks like {', '.join(album['tracks'][:5])}...."
+    )
+    # A copy of the details still gets a preview, computed on the fly
+    copied = chatbot_processor._generate_basic_response(
+        "album.specific", [{"type": "album", "value": dict(album)}]
+    )
+    assert copied == response
+
+
+def test_is_word_char_matches_regex_word_class():
+    import re
+
+    from app.chatbot.processor import _is_word_char
+
+    for code in range(0x3000):
+        char = chr(code)
+        assert _is_word_char(char) == bool(re.match(r"\w", char)), hex(code)
+
+
+def test_context_pattern_counts(memory_manager):
+    session_id = memory_manager.create_session()
+    for intent in ("member.biography", "band.members", "album.info", "greetings.hello"):
+        memory_manager.add_message(
+            session_id, "hi", {"message": "", "intent": intent, "entities": []}
+        )
+    patterns = memory_manager.sessions[session_id]["context"]["patterns"]
+    assert patterns["member_questions"] == 2
+    assert patterns["album_questions"] == 1
+    assert patterns["song_questions"] == 0
+
+
+def test_follow_up_questions_are_counted(memory_manager):
+    session_id = memory_manager.create_session()
+    for message in ("What about Flea?", "Hello", "Who WROTE it", "Bye"):
+        memory_manager.add_message(
+            session_id, message, {"message": "", "intent": "unknown", "entities": []}
+        )
+    session = memory_manager.sessions[session_id]
+    assert session["context"]["patterns"]["follow_up_questions"] == 2
+    assert session["messages"][-1]["timestamp"] == session["last_activity"].isoformat()
+
+
+def test_song_aliases_match_exact_titles(chatbot_processor):
+    """Song nicknames are looked up by the exact lowercased track title."""
+    songs = {song["name"]: song for song in chatbot_processor.known_songs}
+    assert "rt" in songs["road trippin'"]["variations"]
+    assert "wt" in songs["whatchu thinkin'"]["variations"]
+    assert "utb" in songs["under the bridge"]["variations"]
+
+
+def test_classifications_are_memoized(chatbot_processor, monkeypatch):
+    chatbot_processor._proba_row_cached.cache_clear()
+    first = chatbot_processor.get_classifications("who is flea")
+    monkeypatch.setattr(
+        chatbot_processor,
+        "_predict_proba",
+        lambda messages: pytest.fail("cached message re-ran the model"),
+    )
+    second = chatbot_processor.get_classifications("who is flea", top_k=3)
+    assert second == first[:3]
+    row = chatbot_processor._proba_row_cached("who is flea")
+    assert not row.flags.writeable
+
+
+def test_process_messages_matches_process_message(chatbot_processor):
+    messages = ["Hello there", "who is flea", "tell me about californication"]
+    batch = chatbot_processor.process_messages(messages)
+    assert len(batch) == len(messages)
+    for message, result in zip(messages, batch, strict=True):
+        expected = chatbot_processor.process_message(message)
+        assert result["intent"] == expected["intent"]
+        assert result["confidence"] == pytest.approx(expected["confidence"])
+        assert result["entities"] == expected["entities"]
+    assert chatbot_processor.process_messages([]) == []
+
+
+@pytest.mark.parametrize(
+    "message,expected_intent",
+    [
+        ("Hi!", "greetings.hello"),
+        (" hello. ", "greetings.hello"),
+        ("Goodbye", "greetings.bye"),
+        ("", "unknown"),
+        ("   ", "unknown"),
+    ],
+)
+def test_trivial_messages_skip_the_classifier(
+    chatbot_processor, monkeypatch, message, expected_intent
+):
+    monkeypatch.setattr(
+        chatbot_processor,
+        "_top_intent_cached",
+        lambda message: pytest.fail("trivial message reached the classifier"),
+    )
+    response = chatbot_processor.process_message(message)
+    assert response["intent"] == expected_intent
+    assert response["message"]
+    batch = chatbot_processor.process_messages([message, message])
+    assert [r["intent"] for r in batch] == [expected_intent] * 2
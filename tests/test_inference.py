@@ -3,7 +3,12 @@ import pytest
 
 from app.chatbot.initializer import initialize_chatbot
 from app.chatbot.memory import ConversationMemory
-from app.core.inference import initialize_inference, run_inference
+from app.core.inference import (
+    initialize_inference,
+    run_inference,
+    run_inference_async,
+    run_inference_batch,
+)
 from app.infra.logging import setup_logging
 from app.schemas import Entity, ResponseModel
 
@@ -131,6 +136,173 @@ class TestInferencePipeline:
         assert isinstance(response, ResponseModel)
         assert response.intent in ["greetings.hello", "unknown"]
 
+    @pytest.mark.asyncio
+    async def test_batch_inference_matches_single(self):
+        """Test that batch inference returns what run_inference would"""
+        self.chatbot_processor = await initialize_chatbot()
+        initialize_inference(self.chatbot_processor, self.memory_manager)
+
+        messages = ["hello", "who is anthony kiedis", "xyz random gibberish"]
+        responses = run_inference_batch(messages)
+
+        assert len(responses) == len(messages)
+        for message, response in zip(messages, responses, strict=True):
+            expected = run_inference(message)
+            assert response.intent == expected.intent
+            assert response.raw_intent == expected.raw_intent
+            assert response.raw_confidence == pytest.approx(expected.raw_confidence)
+            assert response.entities == expected.entities
+
+    @pytest.mark.asyncio
+    async def test_async_inference_matches_sync(self):
+        """Test that concurrent async inference returns what run_inference would"""
+        import asyncio
+
+        self.chatbot_processor = await initialize_chatbot()
+        initialize_inference(self.chatbot_processor, self.memory_manager)
+
+        messages = ["hello", "who is anthony kiedis", "xyz random gibberish"]
+        responses = await asyncio.gather(
+            *(run_inference_async(message, self.session_id) for message in messages)
+        )
+
+        for message, response in zip(messages, responses, strict=True):
+            expected = run_inference(message)
+            assert response.intent == expected.intent
+            assert response.raw_confidence == pytest.approx(expected.raw_confidence)
+            assert response.entities == expected.entities
+
+        # Every exchange made it into the session
+        history = self.memory_manager.get_conversation_history(
+            self.session_id, max_messages=10
+        )
+        assert len(history) == len(messages)
+
+    @pytest.mark.asyncio
+    async def test_async_inference_classifies_through_batching_worker(self, monkeypatch):
+        """Test that concurrent async requests share one classifier call"""
+        import asyncio
+
+        self.chatbot_processor = await initialize_chatbot()
+        initialize_inference(self.chatbot_processor, self.memory_manager)
+        calls = []
+        predict_proba = self.chatbot_processor._predict_proba
+
+        def counting_predict_proba(batch):
+            calls.append(list(batch))
+            return predict_proba(batch)
+
+        monkeypatch.setattr(self.chatbot_processor, "_predict_proba", counting_predict_proba)
+
+        messages = ["who is anthony kiedis", "tell me about californication", "hello"]
+        responses = await asyncio.gather(*(run_inference_async(m) for m in messages))
+
+        # Bare greetings never reach the classifier
+        assert calls == [messages[:2]]
+        for message, response in zip(messages, responses, strict=True):
+            assert response.intent == run_inference(message).intent
+        self.chatbot_processor.stop_worker()
+
+    @pytest.mark.asyncio
+    async def test_async_inference_with_concurrent_session_churn(self, monkeypatch):
+        """Test that concurrent requests share memory safely while sessions come and go"""
+        import asyncio
+        import sys
+
+        import app.core.inference as inference_module
+
+        self.chatbot_processor = await initialize_chatbot()
+        # Every session is already expired, so once the store is full each new
+        # session sweeps all of them while other threads keep using the store
+        memory = ConversationMemory(max_sessions=200, session_timeout_hours=0)
+        initialize_inference(self.chatbot_processor, memory)
+        warnings = []
+        monkeypatch.setattr(
+            inference_module.logger, "warning", lambda *args: warnings.append(args)
+        )
+        # Switch threads often so unsynchronized access would show up
+        previous_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+        messages = ["hello", "who is anthony kiedis", "tell me about californication"]
+
+        async def request(i):
+            session_id = await asyncio.to_thread(memory.create_session)
+            return await run_inference_async(messages[i % len(messages)], session_id)
+
+        try:
+            responses = await asyncio.gather(*(request(i) for i in range(600)))
+        finally:
+            sys.setswitchinterval(previous_interval)
+
+        assert all(isinstance(response, ResponseModel) for response in responses)
+        assert warnings == []
+        assert len(memory.sessions) <= memory.max_sessions
+
+    @pytest.mark.asyncio
+    async def test_repeated_messages_reuse_analysis(self):
+        """Test that repeated messages skip classification and canonicalization"""
+        import app.core.inference as inference_module
+
+        self.chatbot_processor = await initialize_chatbot()
+        initialize_inference(self.chatbot_processor, self.memory_manager)
+        assert inference_module._analyze.cache_info().currsize == 0
+
+        first = run_inference("Who is Anthony Kiedis", self.session_id)
+        second = run_inference("who is anthony kiedis")
+        info = inference_module._analyze.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+        assert second.intent == first.intent
+        assert second.entities == first.entities
+
+        # Memory is still updated for the call that had a session
+        history = self.memory_manager.get_conversation_history(self.session_id)
+        assert len(history) == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_entities_are_not_shared(self):
+        """Test that editing a response's entities does not leak into later calls"""
+        self.chatbot_processor = await initialize_chatbot()
+        initialize_inference(self.chatbot_processor, self.memory_manager)
+
+        first = run_inference("tell me about anthony kiedis", self.session_id)
+        assert first.entities
+        expected = [entity.model_dump() for entity in first.entities]
+        first.entities[0].value.clear()
+
+        second = run_inference("tell me about anthony kiedis", self.session_id)
+        assert [entity.model_dump() for entity in second.entities] == expected
+
+        # Memory got the untouched entities for the second exchange as well
+        history = self.memory_manager.get_conversation_history(self.session_id)
+        assert history[-1]["entities"][0]["value"] == expected[0]["value"]
+
+    @pytest.mark.asyncio
+    async def test_memory_receives_plain_response_record(self, monkeypatch):
+        """Test that memory gets the same record a model_dump would produce"""
+        self.chatbot_processor = await initialize_chatbot()
+        initialize_inference(self.chatbot_processor, self.memory_manager)
+        records = []
+        monkeypatch.setattr(
+            self.memory_manager, "add_message", lambda sid, msg, record: records.append(record)
+        )
+
+        response = run_inference("tell me about anthony kiedis", self.session_id)
+
+        assert records == [response.model_dump()]
+        assert all(isinstance(entity, dict) for entity in records[0]["entities"])
+
+    @pytest.mark.asyncio
+    async def test_initialize_loads_knowledge_base(self, monkeypatch):
+        """Test that the knowledge base is loaded at startup, not per request"""
+        import app.knowledge.resolver as resolver_module
+
+        monkeypatch.setattr(resolver_module, "_knowledge_resolver", None)
+        self.chatbot_processor = await initialize_chatbot()
+        initialize_inference(self.chatbot_processor, self.memory_manager)
+
+        assert resolver_module._knowledge_resolver is not None
+
     @pytest.mark.asyncio
     async def test_inference_not_initialized(self):
         """Test error when inference pipeline is not initialized"""
@@ -222,3 +222,55 @@ class TestInferenceResolverIntegration:
         mock_resolver.resolve_member.assert_called_with("anthony")
         mock_resolver.resolve_album.assert_called_with("cali")
         mock_resolver.resolve_song.assert_called_with("unknown_song")
+
+    @patch("app.core.inference.get_knowledge_resolver")
+    def test_canonicalize_entities_resolves_repeated_spans_once(self, mock_get_resolver):
+        """Test that a span mentioned more than once is only resolved once."""
+        # Mock the resolver
+        mock_resolver = MagicMock()
+        mock_get_resolver.return_value = mock_resolver
+
+        mock_resolver.resolve_member.return_value = {
+            "name": "Michael Peter Balzary",
+            "canonical": "flea",
+            "aliases": ["flea"],
+        }
+
+        raw_entities = [
+            {"type": "member", "value": {"text": "flea"}, "confidence": 0.9},
+            {"type": "member", "value": {"text": "flea"}, "confidence": 0.6},
+        ]
+
+        canonical_entities = canonicalize_entities(raw_entities)
+
+        # Both entities are kept, in order, with their own confidence
+        assert [entity.confidence for entity in canonical_entities] == [0.9, 0.6]
+        assert all(entity.value["canonical"] == "flea" for entity in canonical_entities)
+        mock_resolver.resolve_member.assert_called_once_with("flea")
+
+    @patch("app.core.inference.get_knowledge_resolver")
+    def test_canonicalize_entities_empty_input(self, mock_get_resolver):
+        """Test that no entities means no resolver work."""
+        assert canonicalize_entities([]) == []
+        mock_get_resolver.assert_not_called()
+
+    @patch("app.core.inference.get_knowledge_resolver")
+    def test_canonicalize_entities_skips_only_invalid_entities(self, mock_get_resolver):
+        """Test that an invalid entity is dropped without losing its neighbours."""
+        mock_resolver = MagicMock()
+        mock_get_resolver.return_value = mock_resolver
+        mock_resolver.resolve_member.return_value = None
+
+        raw_entities = [
+            {"type": "member", "value": {"text": "flea"}, "confidence": 0.9},
+            {"type": "venue", "value": {"text": "the forum"}, "confidence": 0.9},
+            {"type": "member", "value": {"text": "anthony"}, "confidence": 1.5},
+            {"type": "band", "value": {"text": "rhcp"}, "confidence": 0.8},
+        ]
+
+        canonical_entities = canonicalize_entities(raw_entities)
+
+        assert [(entity.type, entity.confidence) for entity in canonical_entities] == [
+            ("member", 0.9),
+            ("band", 0.8),
+        ]
@@ -2,6 +2,7 @@
 Tests for structured logging functionality.
 """
 
+import json
 import logging
 
 from app.infra.logging import (
@@ -84,6 +85,34 @@ class TestLoggingSetup:
 
         # If we get here without error, the context logging is working
 
+    def test_json_timestamp_uses_record_time(self):
+        """Test that the JSON timestamp is the record's creation time in UTC."""
+        formatter = JSONFormatter()
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+
+        record.created = 0.25
+        entry = json.loads(formatter.format(record))
+        assert entry["ts"] == "1970-01-01T00:00:00.250000Z"
+
+        # Whole seconds keep their fractional part
+        record.created = 1_700_000_000.0
+        entry = json.loads(formatter.format(record))
+        assert entry["ts"] == "2023-11-14T22:13:20.000000Z"
+
+    def test_json_formatter_handles_numpy_and_large_values(self):
+        """Test that JSON logs stay valid for numpy scores and oversized ints."""
+        import numpy as np
+
+        formatter = JSONFormatter()
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+        record.confidence = np.float64(0.875)
+        record.latency_ms = 2**70
+
+        entry = json.loads(formatter.format(record))
+        assert entry["msg"] == "msg"
+        assert entry["confidence"] == 0.875
+        assert entry["latency_ms"] == 2**70
+
     def _capture_logs(self):
         """Context manager to capture log output."""
 
@@ -98,6 +98,20 @@ class TestKnowledgeResolver:
         # Test diacritics (though we don't have any in our test data)
         assert resolver._normalize_span("Björk") == "bjork"  # Example with diacritics
 
+    @patch.object(KnowledgeResolver, '_load_knowledge_base')
+    def test_normalize_span_is_idempotent(self, mock_load):
+        """Test that normalizing a normalized span changes nothing."""
+        mock_load.return_value = None
+        resolver = KnowledgeResolver()
+
+        # Punctuation between spaces must not leave a double space behind
+        assert resolver._normalize_span("scar - tissue") == "scar tissue"
+        assert resolver._normalize_span(" flea! ") == "flea"
+
+        for span in ["Snow (Hey Oh)", "D.H. Peligro", "  Björk -- ", "can't stop"]:
+            normalized = resolver._normalize_span(span)
+            assert resolver._normalize_span(normalized) == normalized
+
     @patch.object(KnowledgeResolver, '_load_knowledge_base')
     def test_calculate_similarity(self, mock_load):
         """Test similarity calculation between spans."""
@@ -226,6 +240,23 @@ class TestKnowledgeResolver:
         result = resolver.resolve_entity("test", "unknown")
         assert result is None
 
+    @patch.object(KnowledgeResolver, '_load_knowledge_base')
+    def test_resolve_entity_stops_at_first_matching_type(self, mock_load):
+        """Test that an untyped resolution skips albums and songs once a member matches."""
+        mock_load.return_value = None
+        resolver = KnowledgeResolver()
+        resolver.members = self.mock_members
+        resolver.albums = self.mock_albums
+        resolver.songs = self.mock_songs
+
+        result = resolver.resolve_entity("fruciante")
+        assert result["name"] == "John Anthony Frusciante"
+        assert resolver._resolve_album_cached.cache_info().currsize == 0
+        assert resolver._resolve_song_cached.cache_info().currsize == 0
+
+        # Without a member match, the album still wins over the song
+        assert resolver.resolve_entity("cali")["title"] == "Californication"
+
     @patch.object(KnowledgeResolver, '_load_knowledge_base')
     def test_no_matches(self, mock_load):
         """Test resolution when no matches are found."""
@@ -249,6 +280,36 @@ class TestKnowledgeResolver:
         result = resolver.resolve_song("fake song")
         assert result is None
 
+    @patch.object(KnowledgeResolver, '_load_knowledge_base')
+    def test_name_index_follows_assignment(self, mock_load):
+        """Test that replacing an entity list rebuilds its normalized name index."""
+        mock_load.return_value = None
+        resolver = KnowledgeResolver()
+
+        resolver.members = self.mock_members
+        assert resolver.resolve_member("Frusciante") is self.mock_members[1]
+
+        # Canonical names take precedence over aliases
+        resolver.members = [{"name": "John", "canonical": "john", "aliases": []}] + self.mock_members
+        assert resolver.resolve_member("JOHN")["name"] == "John"
+
+        resolver.members = []
+        assert resolver.resolve_member("frusciante") is None
+
+    @patch.object(KnowledgeResolver, '_load_knowledge_base')
+    def test_resolution_is_cached_per_normalized_span(self, mock_load):
+        """Test that spans normalizing the same way share one resolution."""
+        mock_load.return_value = None
+        resolver = KnowledgeResolver()
+        resolver.members = self.mock_members
+
+        first = resolver.resolve_member("Fruciante")
+        assert resolver.resolve_member("  fruciante ") is first
+
+        cache_info = resolver._resolve_member_cached.cache_info()
+        assert cache_info.misses == 1
+        assert cache_info.hits == 1
+
 
 class TestResolverFunctions:
     """Test the convenience resolver functions."""
@@ -316,6 +377,10 @@ class TestResolverEdgeCases:
         # Test with numbers
         assert resolver._normalize_span("john123") == "john123"
 
+        # Non-ASCII punctuation is removed, non-ASCII letters are kept
+        assert resolver._normalize_span("Can’t Stop") == "cant stop"
+        assert resolver._normalize_span("Straße") == "straße"
+
     def test_malformed_yaml_handling(self):
         """Test handling of malformed YAML files."""
         # Create a resolver with a non-existent path to test error handling
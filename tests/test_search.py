@@ -1,5 +1,6 @@
 """Tests for the factual search system."""
 
+import dataclasses
 import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
@@ -7,7 +8,7 @@ import tempfile
 import sqlite3
 
 from app.knowledge.search import (
-    Fact, FactSearchEngine, search_facts, get_facts_by_canonical,
+    CONNECTION_POOL_SIZE, Fact, FactSearchEngine, search_facts, search_facts_batch, get_facts_by_canonical,
     get_facts_by_type, get_database_stats
 )
 
@@ -184,6 +185,22 @@ class TestFactSearchEngine:
         assert len(facts) > 0
         assert all(f.type == "album" for f in facts)
     
+    def test_search_facts_ordered_by_relevance(self):
+        """Test that results carry BM25 scores and come back best first."""
+        engine = FactSearchEngine(str(self.db_path))
+
+        facts = engine.search_facts("californication", k=5)
+        assert len(facts) == 3
+        assert all(f.rank is not None for f in facts)
+        assert [f.rank for f in facts] == sorted(f.rank for f in facts)
+
+        # The title matches in both the canonical and value columns
+        assert facts[0].field == "title"
+
+        # Relevance wins over insertion order: only fact 2 matches both terms
+        facts = engine.search_facts("guitar OR frusciante", k=5)
+        assert [f.id for f in facts] == [2, 1, 3, 4]
+
     def test_search_facts_empty_query(self):
         """Test search with empty query."""
         engine = FactSearchEngine(str(self.db_path))
@@ -194,6 +211,22 @@ class TestFactSearchEngine:
         facts = engine.search_facts("   ", k=5)
         assert facts == []
     
+    def test_search_facts_batch(self):
+        """Test that a batch returns what the individual searches would."""
+        engine = FactSearchEngine(str(self.db_path))
+        queries = [
+            ("frusciante", 5, None),
+            ("californication", 5, "album"),
+            ("   ", 5, None),
+            ('"unbalanced', 5, None),
+        ]
+
+        results = engine.search_facts_batch(queries)
+
+        assert results == [engine.search_facts(*query) for query in queries]
+        assert len(results[0]) > 0
+        assert results[2] == [] and results[3] == []
+
     def test_get_facts_by_canonical(self):
         """Test getting facts for a specific canonical entity."""
         engine = FactSearchEngine(str(self.db_path))
@@ -225,6 +258,49 @@ class TestFactSearchEngine:
         facts = engine.get_facts_by_canonical("john frusciante", "album")
         assert len(facts) == 0
     
+    def test_repeated_lookups_are_cached(self):
+        """Test that repeated lookups skip the database and return fresh lists."""
+        engine = FactSearchEngine(str(self.db_path))
+
+        first = engine.get_facts_by_canonical("john frusciante")
+        first.clear()
+        with patch.object(engine, "_connection", side_effect=AssertionError("queried database")):
+            second = engine.get_facts_by_canonical("john frusciante")
+        assert len(second) == 4
+
+        assert engine.search_facts(" frusciante ", k=5) == engine.search_facts("frusciante", k=5)
+        assert engine._search_facts_cached.cache_info().hits == 1
+
+        # Failed searches are not remembered
+        assert engine.search_facts('"unbalanced', k=5) == []
+        assert engine._search_facts_cached.cache_info().currsize == 1
+
+        engine.clear_cache()
+        assert engine._search_facts_cached.cache_info().currsize == 0
+        assert len(engine.get_facts_by_canonical("john frusciante")) == 4
+
+    def test_cached_search_results_cannot_be_modified(self):
+        """Test that callers cannot change the facts later searches return."""
+        engine = FactSearchEngine(str(self.db_path))
+
+        first = engine.search_facts("frusciante", k=5)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            first[0].value = "MUTATED"
+        assert engine.search_facts("frusciante", k=5) == first
+        assert "MUTATED" not in [fact.value for fact in first]
+        engine.close()
+
+    def test_canonical_index_cannot_be_modified(self):
+        """Test that callers cannot change the facts held by the canonical index."""
+        engine = FactSearchEngine(str(self.db_path))
+
+        first = engine.get_facts_by_canonical("john frusciante", "member")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            first[0].value = "MUTATED"
+        assert engine.get_facts_by_canonical("john frusciante", "member") == first
+        assert engine.get_facts_by_canonical("john frusciante")[0].value != "MUTATED"
+        engine.close()
+
     def test_get_facts_by_type(self):
         """Test getting facts of a specific type."""
         engine = FactSearchEngine(str(self.db_path))
@@ -265,10 +341,62 @@ class TestFactSearchEngine:
         assert "database_size_bytes" in stats
         assert "database_path" in stats
 
+    def test_lookups_reuse_pooled_connections(self):
+        """Test that lookups reuse the connections opened at initialization."""
+        with patch("app.knowledge.search.sqlite3.connect", wraps=sqlite3.connect) as mock_connect:
+            engine = FactSearchEngine(str(self.db_path))
+            engine.search_facts("frusciante", k=5)
+            engine.get_facts_by_canonical("john frusciante")
+            engine.get_facts_by_type("member")
+            engine.get_database_stats()
+
+        assert mock_connect.call_count == CONNECTION_POOL_SIZE
+        engine.close()
+
+    def test_connections_are_read_only_and_thread_safe(self):
+        """Test that pooled connections refuse writes and serve other threads."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        engine = FactSearchEngine(str(self.db_path))
+        with engine._connection() as conn, pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM facts")
+
+        # More threads than connections: the extra lookups wait for one
+        with ThreadPoolExecutor(max_workers=CONNECTION_POOL_SIZE * 2) as pool:
+            counts = list(pool.map(lambda _: len(engine.get_facts_by_type("member")), range(40)))
+        assert counts == [4] * 40
+        engine.close()
+
 
 class TestSearchFunctions:
     """Test the convenience search functions."""
-    
+
+    def test_global_engine_is_built_once_under_concurrency(self):
+        """Test that concurrent first lookups share a single global engine."""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.knowledge.search import get_search_engine
+
+        barrier = threading.Barrier(8)
+
+        def slow_engine():
+            time.sleep(0.05)
+            return MagicMock()
+
+        def first_lookup(_):
+            barrier.wait()
+            return get_search_engine()
+
+        with patch("app.knowledge.search._search_engine", None), patch(
+            "app.knowledge.search.FactSearchEngine", side_effect=slow_engine
+        ) as mock_engine_class, ThreadPoolExecutor(max_workers=8) as pool:
+            engines = list(pool.map(first_lookup, range(8)))
+
+        assert mock_engine_class.call_count == 1
+        assert all(engine is engines[0] for engine in engines)
+
     @patch("app.knowledge.search.get_search_engine")
     def test_search_facts_function(self, mock_get_engine):
         """Test the search_facts convenience function."""
@@ -285,6 +413,19 @@ class TestSearchFunctions:
         assert result == test_facts
         mock_engine.search_facts.assert_called_once_with("frusciante", 5, None)
     
+    @patch("app.knowledge.search.get_search_engine")
+    def test_search_facts_batch_function(self, mock_get_engine):
+        """Test the search_facts_batch convenience function."""
+        mock_engine = MagicMock()
+        mock_get_engine.return_value = mock_engine
+        mock_engine.search_facts_batch.return_value = [[], []]
+
+        queries = [("frusciante", 5, None), ("californication", 3, "album")]
+        result = search_facts_batch(queries)
+
+        assert result == [[], []]
+        mock_engine.search_facts_batch.assert_called_once_with(queries)
+
     @patch("app.knowledge.search.get_search_engine")
     def test_get_facts_by_canonical_function(self, mock_get_engine):
         """Test the get_facts_by_canonical convenience function."""